@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .skills import get_skill_matcher
+        from .timing import install_query_counter
+
+        connection_created.connect(install_query_counter)
+
+        # Compile the skill taxonomy once at startup rather than on the first upload
+        get_skill_matcher()
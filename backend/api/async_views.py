@@ -0,0 +1,128 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .bitmap_index import filter_candidates
+from .matching import JOB_MATCH_UPSERT, amatch_job, job_match_rows
+from .models import Job, JobMatch
+from .scoring import ScoringPoolSaturated, get_scoring_pool
+from .search_index import build_search_results, candidate_resumes, result_rows
+from .serializers import AskQuerySerializer, MatchJobSerializer
+from .utils import ScoringProgress, fetch_within_budget, rank_resumes
+
+def error_response(code: str, message: str, status_code: int, **extra) -> JsonResponse:
+    return JsonResponse({'error': {'code': code, 'message': message, **extra}}, status=status_code)
+
+async def authenticate(request):
+    """Authenticate a JWT bearer token the way the DRF views do; returns the user or None"""
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except APIException:
+        return None
+    return result[0] if result else None
+
+def parse_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+def busy_response() -> JsonResponse:
+    response = error_response(
+        'SCORING_BUSY', 'Too many scoring requests in progress, please retry shortly',
+        status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response['Retry-After'] = '1'
+    return response
+
+def validated(serializer_class, request):
+    """(validated data, None) or (None, error response)"""
+    data = parse_body(request)
+    if data is None:
+        return None, error_response('VALIDATION_ERROR', 'Request body must be JSON', status.HTTP_400_BAD_REQUEST)
+    serializer = serializer_class(data=data)
+    if not serializer.is_valid():
+        return None, error_response(
+            'VALIDATION_ERROR', 'Invalid parameters', status.HTTP_400_BAD_REQUEST, details=serializer.errors
+        )
+    return serializer.validated_data, None
+
+@csrf_exempt
+@require_POST
+async def ask_query_async(request):
+    """POST /api/ask/async - /api/ask with async reads and scoring in the bounded pool"""
+    if await authenticate(request) is None:
+        return error_response('UNAUTHORIZED', 'Authentication credentials were not provided or are invalid',
+                              status.HTTP_401_UNAUTHORIZED)
+    data, error = validated(AskQuerySerializer, request)
+    if error:
+        return error
+
+    query = data['query']
+    progress = ScoringProgress(data.get('budget_ms'))
+    pool = get_scoring_pool()
+    try:
+        # Take a place before loading the candidates, so a busy server refuses without reading them
+        with pool.reserve():
+            candidates = await sync_to_async(filter_candidates)(data.get('filter'))
+            rows = await sync_to_async(fetch_within_budget)(
+                candidate_resumes(query), ('id', 'search_document'), progress, candidates
+            )
+            ranked = await pool.submit(rank_resumes, query, rows, data['k'], progress, candidates)
+    except ScoringPoolSaturated:
+        return busy_response()
+    rows = [row async for row in result_rows(ranked)]
+
+    return JsonResponse({
+        'query': query,
+        'total_results': progress.matched,
+        'partial': progress.partial,
+        'scored_fraction': round(progress.fraction_scored, 4),
+        'results': build_search_results(query, ranked, rows)
+    })
+
+@csrf_exempt
+@require_POST
+async def match_job_async(request, job_id):
+    """POST /api/jobs/:id/match/async - job matching with scoring in the bounded pool"""
+    if await authenticate(request) is None:
+        return error_response('UNAUTHORIZED', 'Authentication credentials were not provided or are invalid',
+                              status.HTTP_401_UNAUTHORIZED)
+    try:
+        job = await aget_object_or_404(Job, id=job_id)
+    except Http404 as e:
+        # The body DRF gives the sync endpoint
+        return JsonResponse({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+    data, error = validated(MatchJobSerializer, request)
+    if error:
+        return error
+
+    top_n = data['top_n']
+    progress = ScoringProgress(data.get('budget_ms'))
+    pool = get_scoring_pool()
+    try:
+        with pool.reserve():
+            candidates = await sync_to_async(filter_candidates)(data.get('filter'))
+            matches, cache_status = await amatch_job(pool, job, top_n, progress, candidates)
+    except ScoringPoolSaturated:
+        return busy_response()
+
+    if cache_status != 'hit':
+        await JobMatch.objects.abulk_create(job_match_rows(job, matches), **JOB_MATCH_UPSERT)
+
+    return JsonResponse({
+        'job_id': job_id,
+        'job_title': job.title,
+        'total_matches': len(matches),
+        'partial': progress.partial,
+        'scored_fraction': round(progress.fraction_scored, 4),
+        'cache_status': cache_status,
+        'matches': matches
+    })
@@ -0,0 +1,174 @@
+"""Deterministic synthetic resumes and jobs for benchmarks.
+
+Kept free of Django imports so corpora can be generated and scored in
+plain processes as well as through the management commands.
+"""
+import os
+import random
+from typing import Dict, Iterator, List
+
+from docx import Document
+
+from ..skills import get_skill_matcher
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+FIRST_NAMES = [
+    'Ada', 'Alan', 'Amara', 'Ana', 'Arjun', 'Bea', 'Carlos', 'Chen', 'Dara', 'Diego', 'Elena', 'Emeka',
+    'Fatima', 'Grace', 'Hana', 'Ibrahim', 'Ines', 'Jonas', 'Kai', 'Lena', 'Liam', 'Mei', 'Mateo', 'Nadia',
+    'Noah', 'Olga', 'Priya', 'Rafael', 'Sara', 'Tariq', 'Uma', 'Viktor', 'Wen', 'Yara', 'Yusuf', 'Zoe',
+]
+LAST_NAMES = [
+    'Adeyemi', 'Bauer', 'Costa', 'Dubois', 'Eriksen', 'Fernandez', 'Garcia', 'Haddad', 'Ivanova', 'Jensen',
+    'Kim', 'Lopez', 'Mehta', 'Nakamura', 'Okafor', 'Petrov', 'Quinn', 'Rossi', 'Silva', 'Tanaka', 'Usman',
+    'Varga', 'Wang', 'Xu', 'Yilmaz', 'Zhang',
+]
+TITLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Full Stack Engineer', 'Data Scientist',
+    'Data Engineer', 'DevOps Engineer', 'Site Reliability Engineer', 'Machine Learning Engineer',
+    'Mobile Developer', 'QA Engineer', 'Security Engineer', 'Engineering Manager', 'Cloud Architect',
+]
+COMPANIES = [
+    'Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Enterprises', 'Hooli',
+    'Pied Piper', 'Vandelay Industries', 'Soylent', 'Tyrell Systems', 'Cyberdyne', 'Wonka Analytics',
+]
+DEGREES = [
+    'BSc Computer Science', 'MSc Computer Science', 'BEng Software Engineering', 'MSc Data Science',
+    'BSc Mathematics', 'PhD Machine Learning', 'BSc Information Systems',
+]
+UNIVERSITIES = [
+    'State University', 'Institute of Technology', 'Polytechnic University', 'City College',
+    'National University', 'University of Applied Sciences',
+]
+VERBS = [
+    'Built', 'Designed', 'Led', 'Migrated', 'Optimized', 'Maintained', 'Automated', 'Scaled', 'Shipped',
+    'Refactored', 'Launched', 'Monitored',
+]
+OBJECTS = [
+    'payment services', 'a recommendation engine', 'the data pipeline', 'internal tooling', 'REST APIs',
+    'the customer portal', 'CI/CD pipelines', 'analytics dashboards', 'a search platform',
+    'event-driven microservices', 'the mobile app backend', 'observability tooling',
+]
+OUTCOMES = [
+    'cutting latency by {n}%', 'serving {n}k daily users', 'reducing costs by {n}%',
+    'improving reliability to 99.{n}%', 'handling {n}M events per day', 'shortening release cycles by {n}%',
+]
+
+def skill_names() -> List[str]:
+    return get_skill_matcher().names
+
+def generate_resume(rng: random.Random, index: int) -> Dict:
+    """One synthetic resume: name, email, skills and plain-text body"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    skills = rng.sample(skill_names(), rng.randint(4, 12))
+    title = rng.choice(TITLES)
+    years = rng.randint(1, 20)
+    start_year = 2024 - years
+
+    lines = [
+        f'{first} {last}',
+        f'{title} | {first.lower()}.{last.lower()}{index}@example.com | +1 555 {rng.randint(1000000, 9999999)}',
+        '',
+        'SUMMARY',
+        f'{title} with {years}+ years of experience in {", ".join(skills[:3])}.',
+        '',
+        'EXPERIENCE',
+    ]
+    year = start_year
+    while year < 2024:
+        span = min(rng.randint(1, 5), 2024 - year)
+        end = 'present' if year + span >= 2024 else str(year + span)
+        lines.append(f'{rng.choice(TITLES)}, {rng.choice(COMPANIES)}  {year} - {end}')
+        for _ in range(rng.randint(2, 4)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 9))
+            lines.append(f'- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}, {outcome}.')
+        year += span
+    lines += [
+        '',
+        'SKILLS',
+        ', '.join(skills),
+        '',
+        'EDUCATION',
+        f'{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)} {start_year - 4} - {start_year}',
+    ]
+    return {
+        'name': f'{first} {last}',
+        'email': f'{first.lower()}.{last.lower()}{index}@example.com',
+        'skills': ', '.join(skills),
+        'text': '\n'.join(lines),
+    }
+
+def generate_resumes(count: int, seed: int = 0) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for index in range(count):
+        yield generate_resume(rng, index)
+
+def generate_job(rng: random.Random) -> Dict:
+    skills = rng.sample(skill_names(), rng.randint(3, 8))
+    title = rng.choice(TITLES)
+    return {
+        'title': title,
+        'company': rng.choice(COMPANIES),
+        'description': f'We are hiring a {title} to work on {rng.choice(OBJECTS)} using {", ".join(skills)}.',
+        'requirements': (
+            f'{skills[0]} and {skills[1]} required. {rng.randint(2, 8)}+ years of experience. '
+            f'Experience with {", ".join(skills[2:])} is a plus.'
+        ),
+    }
+
+def generate_jobs(count: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed + 1)
+    return [generate_job(rng) for _ in range(count)]
+
+def _pdf_escape(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def write_pdf(path: str, text: str, lines_per_page: int = 50) -> None:
+    """Write text as a simple multi-page PDF (Helvetica, one text object per page)"""
+    lines = text.split('\n')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', b'', b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page in pages:
+        body = ['BT /F1 10 Tf 14 TL 50 750 Td']
+        body += [f'({_pdf_escape(line)}) Tj T*' for line in page]
+        body.append('ET')
+        stream = '\n'.join(body).encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        objects.append((
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R '
+            '/Resources << /Font << /F1 3 0 R >> >> >>'
+        ).encode())
+        page_ids.append(len(objects))
+    kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+    objects[1] = f'<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>'.encode()
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode()
+    output += f'trailer << /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    with open(path, 'wb') as f:
+        f.write(output)
+
+def write_docx(path: str, text: str) -> None:
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    document.save(path)
+
+def write_text(path: str, text: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+WRITERS = {'txt': write_text, 'docx': write_docx, 'pdf': write_pdf}
+
+def write_resume_file(directory: str, index: int, resume: Dict, file_format: str) -> str:
+    path = os.path.join(directory, f'resume_{index:07d}.{file_format}')
+    WRITERS[file_format](path, resume['text'])
+    return path
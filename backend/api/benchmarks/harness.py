@@ -0,0 +1,200 @@
+"""Latency and memory measurements for the search, matching, extraction and HTTP paths."""
+import itertools
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import Job, Resume
+from ..utils import extract_text_from_file, find_matching_resumes, match_job_with_resumes
+from .corpus import WRITERS, generate_jobs, generate_resumes
+
+BENCHMARK_USERNAME = 'benchmark'
+
+# Absolute changes below these are treated as noise when comparing reports
+NOISE_FLOOR = {'median_ms': 1.0, 'peak_alloc_kb': 64.0}
+
+# Fields the scoring functions read from each row
+ROW_FIELDS = ('id', 'name', 'email', 'skills', 'experience', 'extracted_text', 'search_document')
+
+def benchmark_user() -> User:
+    user, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME, defaults={'email': 'benchmark@example.com'})
+    return user
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+def measure(func: Callable, repeat: int = 5, warmup: int = 1) -> Dict:
+    """Time ``repeat`` calls of func, then trace one more for its peak Python allocation.
+
+    tracemalloc slows the interpreter down, so it is kept out of the timed runs.
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    timings.sort()
+    return {
+        'runs': repeat,
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(_percentile(timings, 0.5), 3),
+        'p95_ms': round(_percentile(timings, 0.95), 3),
+        'max_ms': round(timings[-1], 3),
+        'peak_alloc_kb': round(peak / 1024, 1),
+    }
+
+def result_key(result: Dict) -> str:
+    return f"{result['name']}[{result.get('format') or result.get('size')}]"
+
+def benchmark_functions(query: str, job_requirements: str, sizes: Iterable[int], repeat: int) -> List[Dict]:
+    """find_matching_resumes and match_job_with_resumes over the first ``size`` stored resumes"""
+    sizes = sorted(set(sizes))
+    rows = list(Resume.objects.order_by('-created_at', '-id').values(*ROW_FIELDS)[:sizes[-1]])
+    results = []
+    for size in sizes:
+        subset = rows[:size]
+        results.append({'name': 'find_matching_resumes', 'size': len(subset),
+                        **measure(lambda: find_matching_resumes(query, subset, k=10), repeat)})
+        results.append({'name': 'match_job_with_resumes', 'size': len(subset),
+                        **measure(lambda: match_job_with_resumes(job_requirements, subset, top_n=10), repeat)})
+    return results
+
+def benchmark_extraction(directory: str, repeat: int, seed: int = 0) -> List[Dict]:
+    """extract_text_from_file on a several-page synthetic resume in each format"""
+    text = '\n\n'.join(resume['text'] for resume in generate_resumes(8, seed))
+    results = []
+    for file_format, write in WRITERS.items():
+        path = os.path.join(directory, f'extraction.{file_format}')
+        write(path, text)
+        results.append({'name': 'extract_text_from_file', 'format': file_format,
+                        **measure(lambda: extract_text_from_file(path), repeat)})
+    return results
+
+def benchmark_http(query: str, job: Dict, directory: str, repeat: int, seed: int = 0) -> List[Dict]:
+    """The main endpoints through the full middleware stack, as the benchmark user.
+
+    Rate limiting is lifted and uploads are extracted inline so the numbers
+    are the cost of the request itself. Resumes and jobs created here are
+    removed again afterwards.
+    """
+    user = benchmark_user()
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    job = Job.objects.create(created_by=user, **job)
+    match_url = f'/api/jobs/{job.id}/match/'
+
+    # Every upload gets distinct bytes so the extraction cache is not hit
+    upload_text = next(iter(generate_resumes(1, seed)))['text']
+    uploads = itertools.count()
+    created = []
+
+    def upload():
+        number = next(uploads)
+        path = os.path.join(directory, f'upload_{number}.pdf')
+        WRITERS['pdf'](path, f'{upload_text}\nReference {number}')
+        with open(path, 'rb') as f:
+            response = client.post('/api/resumes/', {'file': f})
+        created.append(response.json().get('id'))
+
+    def match(cold: bool):
+        if cold:
+            cache.delete(f'job_match:{job.id}')
+        client.post(match_url, {'top_n': 10}, content_type='application/json')
+
+    cases = [
+        ('POST /api/ask', lambda: client.post('/api/ask/', {'query': query, 'k': 10},
+                                              content_type='application/json')),
+        ('POST /api/jobs/:id/match (cold)', lambda: match(cold=True)),
+        ('POST /api/jobs/:id/match (cached)', lambda: match(cold=False)),
+        ('GET /api/resumes', lambda: client.get('/api/resumes/', {'limit': 20})),
+        ('GET /api/resumes?q=', lambda: client.get('/api/resumes/', {'q': query.split()[0], 'limit': 20})),
+        ('POST /api/resumes (pdf upload)', upload),
+    ]
+    results = []
+    try:
+        with override_settings(DEBUG=False, RATE_LIMIT_TOKENS=10 ** 9, RESUME_INGESTION_ASYNC=False):
+            for name, func in cases:
+                results.append({'name': name, 'size': Resume.objects.count(), **measure(func, repeat)})
+    finally:
+        for resume in Resume.objects.filter(id__in=[resume_id for resume_id in created if resume_id]):
+            default_storage.delete(resume.file.name)
+            resume.delete()
+        job.delete()
+    return results
+
+def run_benchmarks(sizes: Optional[Iterable[int]] = None, repeat: int = 5, http: bool = True,
+                   seed: int = 0) -> Dict:
+    """Run the whole suite against the current database and return a JSON-ready report"""
+    job = generate_jobs(1, seed)[0]
+    query = job['description']
+    corpus_size = Resume.objects.count()
+    sizes = [size for size in (sizes or [corpus_size]) if size] or [corpus_size]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        if corpus_size:
+            results += benchmark_functions(query, job['requirements'], sizes, repeat)
+        results += benchmark_extraction(directory, repeat, seed)
+        if http:
+            results += benchmark_http(query, job, directory, repeat, seed)
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'database': connection.vendor,
+            'corpus_size': corpus_size,
+            'job_match_engine': settings.JOB_MATCH_ENGINE,
+            'resume_search_backend': settings.RESUME_SEARCH_BACKEND,
+        },
+        'results': results,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """Results whose median latency or peak allocation grew by more than ``tolerance``"""
+    previous = {result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+        for metric, floor in NOISE_FLOOR.items():
+            grown = result[metric] - before[metric]
+            if before[metric] and grown > floor and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append({
+                    'benchmark': result_key(result),
+                    'metric': metric,
+                    'baseline': before[metric],
+                    'current': result[metric],
+                    'change': round(result[metric] / before[metric] - 1, 3),
+                })
+    return regressions
+
+def write_report(report: Dict, path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, default=str)
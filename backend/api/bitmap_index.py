@@ -0,0 +1,242 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .models import CorpusState, Resume, ResumeSkill
+from .skills import skill_key
+from .timing import span
+
+# "At least N years" bitsets exist for every whole year up to this cap
+MAX_EXPERIENCE_YEARS = 50
+
+class FilterSyntaxError(ValueError):
+    """Raised for malformed candidate filter expressions"""
+
+FILTER_TOKEN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+YEARS_TERM = re.compile(r'^years>=(\d+)$', re.IGNORECASE)
+
+def tokenize_filter(expression: str) -> List[Tuple[str, str]]:
+    """(kind, value) tokens: '(' ')' 'and' 'or' 'not' 'years' or 'skill'"""
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = FILTER_TOKEN.match(expression, position)
+        if not match:
+            raise FilterSyntaxError(f'Unexpected character at position {position}')
+        position = match.end()
+        opening, closing, quoted, word = match.groups()
+        if opening or closing:
+            tokens.append((opening or closing, ''))
+        elif quoted is not None:
+            tokens.append(('skill', quoted))
+        elif word.lower() in ('and', 'or', 'not'):
+            tokens.append((word.lower(), ''))
+        elif YEARS_TERM.match(word):
+            tokens.append(('years', YEARS_TERM.match(word).group(1)))
+        else:
+            tokens.append(('skill', word))
+    return tokens
+
+def parse_filter(expression: str):
+    """Parse a filter into a nested tuple tree.
+
+    Grammar: ``or := and (OR and)*``, ``and := not (AND? not)*``,
+    ``not := NOT not | ( or ) | years>=N | skill``. Adjacent terms are
+    ANDed, and multi-word skills are quoted: ``python "machine learning"
+    (django OR flask) NOT php years>=5``.
+    """
+    tokens = tokenize_filter(expression)
+    if not tokens:
+        raise FilterSyntaxError('Empty filter')
+    position = 0
+
+    def peek():
+        return tokens[position][0] if position < len(tokens) else None
+
+    def take(kind):
+        nonlocal position
+        if peek() != kind:
+            raise FilterSyntaxError(f"Expected {kind!r} at token {position + 1}")
+        position += 1
+        return tokens[position - 1][1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == 'or':
+            take('or')
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() in ('and', 'not', '(', 'skill', 'years'):
+            if peek() == 'and':
+                take('and')
+            node = ('and', node, parse_not())
+        return node
+
+    def parse_not():
+        kind = peek()
+        if kind == 'not':
+            take('not')
+            return ('not', parse_not())
+        if kind == '(':
+            take('(')
+            node = parse_or()
+            take(')')
+            return node
+        if kind == 'years':
+            return ('years', int(take('years')))
+        if kind == 'skill':
+            return ('skill', skill_key(take('skill')))
+        raise FilterSyntaxError(f'Unexpected {kind or "end of filter"} at token {position + 1}')
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise FilterSyntaxError(f'Unexpected {tokens[position][0]!r} at token {position + 1}')
+    return tree
+
+def bitset(positions: List[int]) -> int:
+    """Int with the given bits set"""
+    if not positions:
+        return 0
+    flags = np.zeros(max(positions) + 1, dtype=np.uint8)
+    flags[positions] = 1
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+class BitmapIndex:
+    """One bitset per skill and per "at least N years" bucket over the ready resumes.
+
+    Bitsets are Python ints with bit i standing for position i, so AND/OR/NOT
+    over the whole corpus are single big-integer operations in C. A resume keeps
+    its position for the life of the index (a re-indexed one has its old bits
+    cleared first), so positions stay bounded by the resumes seen; deletes
+    rebuild the index.
+    """
+
+    def __init__(self, generation: int = 0):
+        self.generation = generation
+        self.resume_ids: List = []
+        self.positions: Dict = {}
+        self.skills: Dict[str, int] = {}
+        self.at_least: List[int] = [0] * (MAX_EXPERIENCE_YEARS + 1)
+        self.live = 0
+
+    @classmethod
+    def build(cls, generation: int) -> 'BitmapIndex':
+        index = cls(generation)
+        index.add_rows(indexed_rows(generation__lte=generation))
+        return index
+
+    def add_rows(self, rows: Iterable[Tuple[object, Iterable[str], int, bool]]):
+        """Index (resume id, skill keys, years, ready) rows, replacing earlier entries for the same ids.
+
+        Resumes that are no longer ready are only dropped.
+        """
+        skills: Dict[str, List[int]] = {}
+        by_years: List[List[int]] = [[] for _ in self.at_least]
+        added, reindexed = [], []
+        for resume_id, keys, years, ready in rows:
+            position = self.positions.get(resume_id)
+            if position is None:
+                position = len(self.resume_ids)
+                self.resume_ids.append(resume_id)
+                self.positions[resume_id] = position
+            else:
+                reindexed.append(position)
+            if not ready:
+                continue
+            added.append(position)
+            for key in keys:
+                skills.setdefault(key, []).append(position)
+            by_years[min(years, MAX_EXPERIENCE_YEARS)].append(position)
+
+        if reindexed:
+            # One pass over the bitsets per batch clears the reused positions
+            keep = ~bitset(reindexed)
+            self.skills = {key: bits & keep for key, bits in self.skills.items() if bits & keep}
+            self.at_least = [bits & keep for bits in self.at_least]
+            self.live &= keep
+
+        # Each bitset is built once per batch from its positions, never bit by bit
+        for key, positions in skills.items():
+            self.skills[key] = self.skills.get(key, 0) | bitset(positions)
+        at_least = 0
+        for years in range(MAX_EXPERIENCE_YEARS, -1, -1):
+            at_least |= bitset(by_years[years])
+            self.at_least[years] |= at_least
+        self.live |= bitset(added)
+
+    def evaluate(self, tree) -> int:
+        kind = tree[0]
+        if kind == 'skill':
+            return self.skills.get(tree[1], 0) & self.live
+        if kind == 'years':
+            return self.at_least[min(tree[1], MAX_EXPERIENCE_YEARS)] & self.live
+        if kind == 'not':
+            return self.live & ~self.evaluate(tree[1])
+        left, right = self.evaluate(tree[1]), self.evaluate(tree[2])
+        return left & right if kind == 'and' else left | right
+
+    def ids(self, bits: int) -> Set:
+        """Resume ids of the set bits"""
+        if not bits:
+            return set()
+        data = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+        positions = np.flatnonzero(np.unpackbits(data, bitorder='little'))
+        resume_ids = self.resume_ids
+        return {resume_ids[position] for position in positions.tolist()}
+
+    def candidates(self, expression: str) -> Set:
+        """Ids of the resumes matching a filter expression"""
+        return self.ids(self.evaluate(parse_filter(expression)))
+
+def indexed_rows(**filters) -> Iterable[Tuple[object, Set[str], int, bool]]:
+    """(resume id, skill keys, years of experience, ready) for the resumes matching filters"""
+    resumes = Resume.objects.filter(**filters)
+    keys: Dict = {}
+    links = ResumeSkill.objects.filter(resume__in=resumes).values_list('resume_id', 'skill__key')
+    for resume_id, key in links.iterator(chunk_size=5000):
+        keys.setdefault(resume_id, set()).add(key)
+    rows = resumes.order_by('created_at', 'id').values_list('id', 'experience_years', 'status')
+    for resume_id, years, status in rows.iterator(chunk_size=5000):
+        yield resume_id, keys.get(resume_id, ()), int(years), status == Resume.STATUS_READY
+
+_index: Optional[BitmapIndex] = None
+_index_lock = threading.Lock()
+
+def get_bitmap_index() -> BitmapIndex:
+    """The process-wide index, brought up to date with the corpus generation.
+
+    New and edited resumes are appended; a delete since the last sync rebuilds it.
+    """
+    global _index
+    generation, last_removal = CorpusState.current()
+    index = _index
+    if index is not None and index.generation == generation:
+        return index
+    with _index_lock:
+        index = _index
+        if index is None or last_removal > index.generation:
+            index = BitmapIndex.build(generation)
+        elif index.generation != generation:
+            index.add_rows(indexed_rows(generation__gt=index.generation, generation__lte=generation))
+            index.generation = generation
+        _index = index
+        return index
+
+def reset_bitmap_index():
+    """Drop the process-wide index so the next use rebuilds it"""
+    global _index
+    with _index_lock:
+        _index = None
+
+def filter_candidates(expression: Optional[str]) -> Optional[Set]:
+    """Ids of the resumes matching a filter expression, or None (no restriction) without one"""
+    if not expression:
+        return None
+    with span('filter'):
+        return get_bitmap_index().candidates(expression)
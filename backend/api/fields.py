@@ -0,0 +1,56 @@
+import zlib
+
+from django.db import models
+
+# One-byte codec marker at the start of every stored value
+CODEC_PLAIN = b'p'
+CODEC_ZLIB = b'z'
+COMPRESSION_LEVEL = 6
+
+def compress_text(text: str) -> bytes:
+    """Marker plus zlib data, or the plain UTF-8 bytes when compressing does not pay off"""
+    data = text.encode('utf-8')
+    compressed = zlib.compress(data, COMPRESSION_LEVEL)
+    if len(compressed) < len(data):
+        return CODEC_ZLIB + compressed
+    return CODEC_PLAIN + data
+
+def decompress_text(value) -> str:
+    if isinstance(value, str):
+        # Rows written before the column was compressed
+        return value
+    value = bytes(value)
+    codec, data = value[:1], value[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode('utf-8')
+    if codec == CODEC_PLAIN:
+        return data.decode('utf-8')
+    raise ValueError(f'Unknown text codec {codec!r}')
+
+class CompressedTextField(models.TextField):
+    """Text kept compressed in a binary column and decompressed when the column is loaded.
+
+    Python code sees plain strings; only queries that select the column pay
+    for reading and inflating it, so scans should leave it out of
+    ``.values()``/``.only()`` until the text is needed. The stored bytes
+    cannot be searched with ``icontains`` and similar lookups.
+    """
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return decompress_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return super().to_python(value)
@@ -0,0 +1,207 @@
+import re
+import uuid
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+
+from .models import Resume, ResumeTerm
+from .tokens import tokenize
+
+FTS_TABLE = 'api_resume_fts'
+QUERY_TOKEN_PATTERN = re.compile(r'\w+')
+
+def query_tokens(query: str) -> List[str]:
+    """Words of a search box query; punctuation is dropped so user input never reaches FTS syntax"""
+    return QUERY_TOKEN_PATTERN.findall(query.lower())
+
+class LikeBackend:
+    """Unindexed icontains filters, for databases without a full-text table"""
+    name = 'like'
+
+    def search(self, queryset, query: str):
+        # The text is stored compressed, so it is matched through the term
+        # index instead: every query term must prefix one of the resume's terms
+        condition = models.Q(name__icontains=query) | models.Q(email__icontains=query) | models.Q(skills__icontains=query)
+        terms = tokenize(query)
+        if terms:
+            condition |= models.Q(*(
+                models.Q(id__in=ResumeTerm.objects.filter(term__startswith=term).values('resume_id'))
+                for term in terms
+            ))
+        return queryset.filter(condition)
+
+    def index(self, resumes: Iterable[Resume]) -> None:
+        pass
+
+    def remove(self, resume_ids: Iterable) -> None:
+        pass
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        return 0
+
+def joined_search(queryset, condition: str, rank: str, params: tuple, rank_params: tuple = ()):
+    """Resumes joined to their full-text row, filtered by ``condition`` and annotated with ``search_rank``.
+
+    Both SQL fragments refer to the joined table by name; joining (rather
+    than a rank subquery per row) ranks all matches in one pass.
+    """
+    return (
+        queryset
+        .filter(search_entry__isnull=False)
+        .filter(RawSQL(condition, params, output_field=models.BooleanField()))
+        .annotate(search_rank=RawSQL(rank, rank_params, output_field=models.FloatField()))
+    )
+
+class SqliteFtsBackend(LikeBackend):
+    """SQLite FTS5 table over name, email, skills and extracted text, ranked with bm25.
+
+    The FTS rowid is derived from the resume UUID so a resume's entry can be
+    replaced or deleted by rowid without scanning the table.
+    """
+    name = 'sqlite_fts5'
+    # bm25 column weights: resume_id, name, email, skills, extracted_text
+    RANK = f'bm25({FTS_TABLE}, 0.0, 10.0, 10.0, 5.0, 1.0)'
+
+    @staticmethod
+    def create_table(cursor) -> None:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "resume_id UNINDEXED, name, email, skills, extracted_text, tokenize='unicode61')"
+        )
+
+    @staticmethod
+    def rowid(resume_id) -> int:
+        return uuid.UUID(str(resume_id)).int & ((1 << 63) - 1)
+
+    def search(self, queryset, query: str):
+        tokens = query_tokens(query)
+        if not tokens:
+            return super().search(queryset, query)
+        # Every word must match, each as a prefix ("pyth" finds "python")
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return joined_search(
+            queryset, f'{FTS_TABLE} MATCH %s', self.RANK, (match,)
+        ).order_by('search_rank', '-created_at')
+
+    def index(self, resumes: Iterable[Resume]) -> None:
+        rows = [
+            (self.rowid(resume.id), uuid.UUID(str(resume.id)).hex, resume.name, resume.email,
+             resume.skills, resume.extracted_text)
+            for resume in resumes
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [row[:1] for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, resume_id, name, email, skills, extracted_text) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, resume_ids: Iterable) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(self.rowid(resume_id),) for resume_id in resume_ids]
+            )
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        return index_all(self, batch_size)
+
+class PostgresFtsBackend(LikeBackend):
+    """Side table holding a weighted tsvector per resume, with a GIN index"""
+    name = 'postgres_tsvector'
+    DOCUMENT = (
+        "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'D')"
+    )
+
+    @staticmethod
+    def create_table(cursor) -> None:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} ('
+            'resume_id uuid PRIMARY KEY REFERENCES api_resume (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document ON {FTS_TABLE} USING GIN (document)')
+
+    def search(self, queryset, query: str):
+        tokens = query_tokens(query)
+        if not tokens:
+            return super().search(queryset, query)
+        ts_query = ' & '.join(f'{token}:*' for token in tokens)
+        return joined_search(
+            queryset,
+            f"{FTS_TABLE}.document @@ to_tsquery('simple', %s)",
+            f"ts_rank_cd({FTS_TABLE}.document, to_tsquery('simple', %s))",
+            (ts_query,), (ts_query,)
+        ).order_by('-search_rank', '-created_at')
+
+    def index(self, resumes: Iterable[Resume]) -> None:
+        rows = [
+            (resume.id, resume.name, resume.email, resume.skills, resume.extracted_text)
+            for resume in resumes
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (resume_id, document) VALUES (%s, {self.DOCUMENT}) '
+                'ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document',
+                rows
+            )
+
+    def remove(self, resume_ids: Iterable) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE resume_id = %s',
+                [(resume_id,) for resume_id in resume_ids]
+            )
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {FTS_TABLE}')
+        return index_all(self, batch_size)
+
+BACKENDS = {
+    'sqlite': SqliteFtsBackend,
+    'postgresql': PostgresFtsBackend,
+}
+
+def index_all(backend: LikeBackend, batch_size: int) -> int:
+    indexed = 0
+    batch = []
+    queryset = Resume.objects.only('id', 'name', 'email', 'skills', 'extracted_text')
+    for resume in queryset.iterator(chunk_size=batch_size):
+        batch.append(resume)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            indexed += len(batch)
+            batch = []
+    backend.index(batch)
+    return indexed + len(batch)
+
+def fulltext_table_exists() -> bool:
+    return FTS_TABLE in connection.introspection.table_names()
+
+_backend = None
+
+def get_fulltext_backend() -> LikeBackend:
+    """Backend chosen by RESUME_SEARCH_BACKEND ('auto' picks the database's full-text support)"""
+    global _backend
+    if _backend is None:
+        choice = settings.RESUME_SEARCH_BACKEND
+        if choice == 'auto':
+            backend_class = BACKENDS.get(connection.vendor, LikeBackend)
+            if backend_class is not LikeBackend and not fulltext_table_exists():
+                # e.g. an SQLite build without FTS5, where the migration skipped the table
+                backend_class = LikeBackend
+        else:
+            backend_class = {cls.name: cls for cls in (LikeBackend, *BACKENDS.values())}[choice]
+        _backend = backend_class()
+    return _backend
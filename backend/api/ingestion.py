@@ -0,0 +1,346 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .models import CorpusState, ExtractionCache, Resume
+from .signals import resumes_bulk_created
+from .utils import EXTRACTOR_VERSION, ExtractionLimits, extract_resume_data
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ProcessPoolExecutor:
+    """Process pool shared by every upload handled by this server process"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn keeps workers free of the parent's DB connections and threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.RESUME_INGESTION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+def reset_executor() -> None:
+    """Drop a broken pool so the next upload starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+# Resume fields filled in by extract_resume_data, also kept in the extraction cache
+EXTRACTED_FIELDS = (
+    'extracted_text', 'skills', 'experience', 'experience_years', 'page_count', 'truncated', 'truncation_reason'
+)
+
+def extraction_limits() -> ExtractionLimits:
+    return ExtractionLimits(
+        max_pages=settings.RESUME_EXTRACTION_MAX_PAGES,
+        max_chars=settings.RESUME_EXTRACTION_MAX_CHARS,
+        time_limit=settings.RESUME_EXTRACTION_TIME_LIMIT,
+    )
+
+class HashingReader:
+    """File-like wrapper that hashes bytes as they are read through it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.hasher = hashlib.sha256()
+
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.hasher.update(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+def store_upload(name: str, stream) -> Tuple[str, str]:
+    """Stream a file to storage in chunks, hashing it on the way.
+
+    Returns the stored name and the SHA-256 of the bytes, so the upload is
+    read once rather than once to hash and again to store.
+    """
+    basename = os.path.basename(name)
+    reader = HashingReader(stream)
+    stored_name = default_storage.save(f'resumes/{basename}', File(reader, name=basename))
+    return stored_name, reader.hexdigest()
+
+def cached_extractions(content_hashes: Iterable[str]) -> Dict[str, Dict]:
+    """Cached extraction results for the given hashes, keyed by hash"""
+    rows = ExtractionCache.objects.filter(
+        content_hash__in=set(content_hashes),
+        extractor_version=EXTRACTOR_VERSION
+    ).values('content_hash', *EXTRACTED_FIELDS)
+    return {row.pop('content_hash'): row for row in rows}
+
+def cache_extractions(results: Dict[str, Dict]) -> None:
+    """Remember extraction results so identical files skip parsing next time"""
+    if not results:
+        return
+    ExtractionCache.objects.bulk_create(
+        [
+            ExtractionCache(content_hash=content_hash, extractor_version=EXTRACTOR_VERSION, **data)
+            for content_hash, data in results.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['content_hash'],
+        update_fields=['extractor_version', *EXTRACTED_FIELDS],
+    )
+
+def store_extraction(resume_id, data: Dict) -> None:
+    """Write extraction results onto the resume and mark it ready"""
+    resume = Resume.objects.filter(id=resume_id).first()
+    if resume is None:  # Deleted while processing
+        return
+    if resume.content_hash:
+        cache_extractions({resume.content_hash: data})
+    for field, value in data.items():
+        setattr(resume, field, value)
+    resume.status = Resume.STATUS_READY
+    resume.processing_error = ''
+    resume.save()
+
+def store_failure(resume_id, error: Exception) -> None:
+    Resume.objects.filter(id=resume_id).update(
+        status=Resume.STATUS_FAILED,
+        processing_error=str(error)
+    )
+
+def process_resume(resume_id) -> None:
+    """Extract a pending resume in the current process"""
+    resume = Resume.objects.get(id=resume_id)
+    try:
+        data = extract_resume_data(resume.file.path, extraction_limits())
+    except Exception as e:
+        logger.exception('Extraction failed for resume %s', resume_id)
+        store_failure(resume_id, e)
+        return
+    store_extraction(resume_id, data)
+
+def _extraction_done(resume_id, future: Future) -> None:
+    # Runs on the executor's result thread, which has its own DB connection
+    close_old_connections()
+    try:
+        try:
+            data = future.result()
+        except Exception as e:
+            logger.exception('Extraction failed for resume %s', resume_id)
+            if isinstance(e, BrokenProcessPool):
+                reset_executor()
+            store_failure(resume_id, e)
+        else:
+            store_extraction(resume_id, data)
+    finally:
+        close_old_connections()
+
+def enqueue_resume(resume: Resume) -> None:
+    """Schedule extraction once the pending row is committed"""
+    if not settings.RESUME_INGESTION_ASYNC:
+        process_resume(resume.id)
+        return
+
+    def submit():
+        future = get_executor().submit(extract_resume_data, resume.file.path, extraction_limits())
+        future.add_done_callback(partial(_extraction_done, resume.id))
+
+    transaction.on_commit(submit)
+
+def process_pending(limit: Optional[int] = None) -> int:
+    """Synchronously extract resumes still marked as processing"""
+    pending = Resume.objects.filter(status=Resume.STATUS_PROCESSING).order_by('created_at')
+    if limit:
+        pending = pending[:limit]
+    resume_ids = list(pending.values_list('id', flat=True))
+    for resume_id in resume_ids:
+        process_resume(resume_id)
+    return len(resume_ids)
+
+# A bulk upload item: (display name, declared size, callable opening a binary stream)
+BulkItem = Tuple[str, int, Callable]
+
+def uploaded_file_items(files) -> List[BulkItem]:
+    return [(upload.name, upload.size, lambda upload=upload: upload) for upload in files]
+
+def archive_items(archive) -> List[BulkItem]:
+    """List the members of a ZIP upload without reading their contents"""
+    archive_file = zipfile.ZipFile(archive)
+    items = []
+    for info in archive_file.infolist():
+        basename = os.path.basename(info.filename)
+        if info.is_dir() or not basename or basename.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        items.append((info.filename, info.file_size, partial(archive_file.open, info)))
+    return items
+
+def extract_many(paths: List[str]) -> List[Tuple[Optional[Dict], str]]:
+    """Extract stored files across the worker pool, returning (data, error) per path"""
+    limits = extraction_limits()
+    if settings.RESUME_INGESTION_WORKERS <= 1 or len(paths) <= 1:
+        futures = None
+    else:
+        executor = get_executor()
+        futures = [executor.submit(extract_resume_data, path, limits) for path in paths]
+
+    results = []
+    for index, path in enumerate(paths):
+        try:
+            data = futures[index].result() if futures else extract_resume_data(path, limits)
+        except Exception as e:
+            logger.exception('Extraction failed for %s', path)
+            if isinstance(e, BrokenProcessPool):
+                reset_executor()
+            results.append((None, str(e)))
+        else:
+            results.append((data, ''))
+    return results
+
+def enqueue_resumes(resumes: List[Resume]) -> None:
+    """Schedule extraction of many pending resumes, parsing identical files once.
+
+    Inline ingestion extracts them across the worker pool and stores each
+    result; async ingestion submits one job per distinct file once the rows
+    are committed.
+    """
+    groups: Dict[str, List[Resume]] = {}
+    for resume in resumes:
+        groups.setdefault(resume.content_hash or str(resume.id), []).append(resume)
+    groups = list(groups.values())
+
+    if not settings.RESUME_INGESTION_ASYNC:
+        results = extract_many([group[0].file.path for group in groups])
+        for group, (data, error) in zip(groups, results):
+            for resume in group:
+                if data is None:
+                    store_failure(resume.id, error)
+                else:
+                    store_extraction(resume.id, data)
+        return
+
+    def submit():
+        executor = get_executor()
+        for group in groups:
+            future = executor.submit(extract_resume_data, group[0].file.path, extraction_limits())
+            for resume in group:
+                future.add_done_callback(partial(_extraction_done, resume.id))
+
+    transaction.on_commit(submit)
+
+# Bulk uploads insert their rows and queue extraction this many files at a time
+BULK_BATCH_SIZE = 100
+
+def insert_bulk_batch(batch: List[Tuple[Dict, Resume]]) -> None:
+    """Insert one batch of a bulk upload and queue the files not seen before.
+
+    Files whose bytes were extracted before are stored ready from the
+    extraction cache; the rest are inserted as processing and extracted by
+    the ingestion pool, like single uploads.
+    """
+    cached = cached_extractions(resume.content_hash for _, resume in batch)
+    pending = []
+    for entry, resume in batch:
+        data = cached.get(resume.content_hash)
+        if data:
+            for field, value in data.items():
+                setattr(resume, field, value)
+            resume.status = Resume.STATUS_READY
+            entry.update(status='created', resume_id=resume.id, cached=True)
+        else:
+            resume.status = Resume.STATUS_PROCESSING
+            pending.append((entry, resume))
+            entry.update(status='processing', resume_id=resume.id)
+        resume.refresh_search_document()  # bulk_create bypasses save()
+
+    resumes = [resume for _, resume in batch]
+    with transaction.atomic():
+        generation = CorpusState.advance()
+        for resume in resumes:
+            resume.generation = generation
+        Resume.objects.bulk_create(resumes, batch_size=500)
+        resumes_bulk_created.send(sender=Resume, resumes=resumes)
+
+    enqueue_resumes([resume for _, resume in pending])
+    if not settings.RESUME_INGESTION_ASYNC:
+        # Inline extraction has finished; report how each file ended up
+        outcome = {
+            resume_id: (status, error) for resume_id, status, error in
+            Resume.objects.filter(id__in=[resume.id for _, resume in pending])
+            .values_list('id', 'status', 'processing_error')
+        }
+        for entry, resume in pending:
+            status, error = outcome.get(resume.id, (Resume.STATUS_FAILED, ''))
+            if status == Resume.STATUS_READY:
+                entry.update(status='created', cached=False)
+            else:
+                entry.update(status='failed', error=error)
+
+def bulk_ingest(items: List[BulkItem], user, idempotency_key: str = '') -> List[Dict]:
+    """Store and insert many resumes, returning a per-file report.
+
+    Rows are committed every BULK_BATCH_SIZE files, as soon as their files are
+    stored, and extracted like single uploads: new files are reported as
+    ``processing`` with their resume id (poll ``/api/resumes/<id>/status/``),
+    unless ingestion runs inline. A request cut short therefore leaves
+    committed rows that ``process_pending_resumes`` can finish and a retry
+    can dedupe against. With an idempotency key each file gets its own key
+    (``<key>:<file name>``), so retrying a partially failed import only
+    creates the missing resumes.
+    """
+    keys = {name: f"{idempotency_key}:{name}" if idempotency_key else '' for name, _, _ in items}
+    existing = {}
+    if idempotency_key:
+        previous = Resume.objects.filter(uploaded_by=user, idempotency_key__in=keys.values())
+        # Files that failed last time are extracted again
+        previous.filter(status=Resume.STATUS_FAILED).delete()
+        existing = dict(previous.values_list('idempotency_key', 'id'))
+
+    report = []
+    batch = []
+    for name, size, open_item in items:
+        entry = {'file': name}
+        report.append(entry)
+        key = keys[name]
+        if key and key in existing:
+            entry.update(status='duplicate', resume_id=existing[key])
+            continue
+        if size > settings.RESUME_BULK_MAX_FILE_SIZE:
+            entry.update(status='failed', error='File exceeds the maximum upload size')
+            continue
+
+        # Stream the file (or archive member) straight to storage
+        with open_item() as stream:
+            stored_name, content_hash = store_upload(name, stream)
+        resume = Resume(
+            id=uuid.uuid4(),
+            name=os.path.splitext(os.path.basename(name))[0],
+            email='extracted@email.com',
+            file=stored_name,
+            uploaded_by=user,
+            idempotency_key=key,
+            content_hash=content_hash,
+        )
+        batch.append((entry, resume))
+        if key:
+            existing[key] = resume.id
+        if len(batch) >= BULK_BATCH_SIZE:
+            insert_bulk_batch(batch)
+            batch = []
+    if batch:
+        insert_bulk_batch(batch)
+    return report
@@ -0,0 +1,83 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.benchmarks.corpus import SCALES, WRITERS, generate_jobs, generate_resumes, write_resume_file
+from api.benchmarks.harness import benchmark_user
+from api.models import CorpusState, Job, Resume
+from api.signals import resumes_bulk_created
+from api.utils import extract_experience_info, extract_experience_years, extract_skills_from_text
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic resumes and jobs for benchmarking, in the database and/or as files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='1k')
+        parser.add_argument('--count', type=int, default=None, help='Exact number of resumes (overrides --scale)')
+        parser.add_argument('--jobs', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-db', action='store_true', help='Only write files')
+        parser.add_argument('--clear', action='store_true', help='Delete earlier synthetic resumes and jobs first')
+        parser.add_argument('--files', default=None, help='Directory to write resume files to')
+        parser.add_argument('--formats', default='txt,docx,pdf')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options['count'] or SCALES[options['scale']]
+        formats = [name.strip() for name in options['formats'].split(',') if name.strip()]
+        unknown = set(formats) - set(WRITERS)
+        if unknown:
+            raise CommandError(f"Unknown formats: {', '.join(sorted(unknown))}")
+        directory = options['files']
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        user = benchmark_user()
+        if options['clear']:
+            Resume.objects.filter(uploaded_by=user).delete()
+            Job.objects.filter(created_by=user).delete()
+
+        batch = []
+        for index, resume in enumerate(generate_resumes(count, options['seed'])):
+            paths = [write_resume_file(directory, index, resume, name) for name in formats] if directory else []
+            if options['no_db']:
+                continue
+            skills = extract_skills_from_text(resume['text'])
+            batch.append(Resume(
+                name=resume['name'],
+                email=resume['email'],
+                file=paths[0] if paths else f'resumes/synthetic/resume_{index:07d}.txt',
+                extracted_text=resume['text'],
+                skills=', '.join(skills),
+                experience=extract_experience_info(resume['text']),
+                experience_years=extract_experience_years(resume['text']),
+                uploaded_by=user,
+                status=Resume.STATUS_READY,
+            ))
+            if len(batch) >= options['batch_size']:
+                self.insert(batch)
+                batch = []
+        if batch:
+            self.insert(batch)
+
+        if not options['no_db']:
+            Job.objects.bulk_create([
+                Job(created_by=user, **job) for job in generate_jobs(options['jobs'], options['seed'])
+            ])
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {count} resumes" + ('' if options['no_db'] else f" and {options['jobs']} jobs")
+            + (f" ({', '.join(formats)} files in {directory})" if directory else '')
+        ))
+
+    def insert(self, resumes):
+        """Insert like bulk ingestion does, so the search indexes are kept up to date"""
+        for resume in resumes:
+            resume.refresh_search_document()  # bulk_create bypasses save()
+        with transaction.atomic():
+            generation = CorpusState.advance()
+            for resume in resumes:
+                resume.generation = generation
+            Resume.objects.bulk_create(resumes)
+            resumes_bulk_created.send(sender=Resume, resumes=resumes)
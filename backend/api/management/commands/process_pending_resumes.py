@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.ingestion import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Extract resumes left in processing state, e.g. after a server restart'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None)
+
+    def handle(self, *args, **options):
+        processed = process_pending(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} pending resumes'))
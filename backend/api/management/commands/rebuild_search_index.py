@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.fulltext import get_fulltext_backend
+from api.search_index import rebuild_index
+from api.skill_index import rebuild_skill_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the resume inverted index used by /api/ask, the full-text index used by ?q= and the skill links used by ?skill='
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        written = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {written} postings'))
+        backend = get_fulltext_backend()
+        indexed = backend.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} resumes for full-text search ({backend.name})'))
+        linked = rebuild_skill_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Linked {linked} resume skills'))
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks.harness import compare, run_benchmarks, write_report
+
+
+class Command(BaseCommand):
+    help = 'Measure latency and memory of search, matching, extraction and the HTTP endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='', help='Comma-separated corpus sizes for the scoring functions')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--no-http', action='store_true', help='Skip the HTTP endpoint benchmarks')
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--baseline', default=None, help='Earlier report to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown, e.g. 0.2 for 20%%')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        report = run_benchmarks(sizes, repeat=options['repeat'], http=not options['no_http'], seed=options['seed'])
+
+        for result in report['results']:
+            label = result.get('format') or f"n={result['size']}"
+            self.stdout.write(
+                f"{result['name']:<36} {label:>9}  median {result['median_ms']:>10.2f} ms  "
+                f"p95 {result['p95_ms']:>10.2f} ms  peak {result['peak_alloc_kb']:>10.1f} KB"
+            )
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                report['regressions'] = compare(json.load(f), report, options['tolerance'])
+        write_report(report, options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['results'])} results to {options['output']}"))
+
+        regressions = report.get('regressions')
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(
+                    f"{regression['benchmark']} {regression['metric']}: "
+                    f"{regression['baseline']} -> {regression['current']} (+{regression['change']:.0%})"
+                )
+            raise CommandError(f'{len(regressions)} performance regressions against {options["baseline"]}')
@@ -0,0 +1,507 @@
+import logging
+import math
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter
+from typing import Container, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CorpusState, JobMatch, Resume
+from .sharding import get_sharded_scorer, reset_sharded_scorer
+from .timing import span
+from .tokens import tokenize
+from .utils import (
+    ScoringProgress, build_job_match, extract_job_skills, fetch_within_budget, rank_job_matches
+)
+
+logger = logging.getLogger(__name__)
+
+SKILLS_WEIGHT = 0.7
+TEXT_WEIGHT = 0.3
+MIN_MATCH_SCORE = 0.1
+
+# Appended segments keep the idf of the terms already known; rebuild once they
+# hold more than this fraction of the rows in the first segment
+REBUILD_FRACTION = 0.2
+
+class TfidfMatrix:
+    """L2-normalised sparse TF-IDF matrix (one row per document).
+
+    Stored column-major (CSC) so that scoring a query only touches the
+    entries of the terms it contains rather than the whole matrix.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, column_ptr: np.ndarray,
+                 rows: np.ndarray, values: np.ndarray, n_rows: int, documents: int):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.column_ptr = column_ptr
+        self.rows = rows
+        self.values = values
+        self.n_rows = n_rows
+        self.documents = documents  # Rows the idf accounts for, across segments
+
+    @classmethod
+    def build(cls, documents: Sequence[str], frozen: Optional['TfidfMatrix'] = None) -> 'TfidfMatrix':
+        """Build a matrix, or with ``frozen`` an extra segment extending its vocabulary and idf.
+
+        Known terms keep the frozen idf; new terms get an idf from their
+        frequency in this segment over all the documents seen so far.
+        """
+        vocabulary: Dict[str, int] = dict(frozen.vocabulary) if frozen else {}
+        known = len(vocabulary)
+        columns: List[int] = []
+        counts: List[int] = []
+        row_lengths: List[int] = []
+        for document in documents:
+            terms = Counter(tokenize(document))
+            length = 0
+            for term, count in terms.items():
+                column = vocabulary.setdefault(term, len(vocabulary))
+                columns.append(column)
+                counts.append(count)
+                length += 1
+            row_lengths.append(length)
+
+        n_rows = len(row_lengths)
+        columns_array = np.asarray(columns, dtype=np.int32)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int32), row_lengths)
+
+        # Smoothed idf and sublinear tf, as in the usual TF-IDF formulation
+        document_frequency = np.bincount(columns_array, minlength=len(vocabulary))
+        total = n_rows + (frozen.documents if frozen else 0)
+        idf = (np.log((1.0 + total) / (1.0 + document_frequency[known:])) + 1.0).astype(np.float32)
+        if frozen:
+            idf = np.concatenate([frozen.idf, idf])
+        values = (1.0 + np.log(np.asarray(counts, dtype=np.float32))) * idf[columns_array]
+
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_rows))
+        norms[norms == 0] = 1.0
+        values = (values / norms[rows]).astype(np.float32)
+
+        order = np.argsort(columns_array, kind='stable')
+        column_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(document_frequency, out=column_ptr[1:])
+        return cls(vocabulary, idf, column_ptr, rows[order], values[order], n_rows, total)
+
+    def vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse, L2-normalised query vector as (columns, weights)"""
+        columns, weights = [], []
+        for term, count in Counter(tokenize(text)).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                columns.append(column)
+                weights.append((1.0 + math.log(count)) * self.idf[column])
+        weights_array = np.asarray(weights, dtype=np.float32)
+        norm = np.linalg.norm(weights_array)
+        if norm:
+            weights_array /= norm
+        return np.asarray(columns, dtype=np.int64), weights_array
+
+    def dot(self, vector: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        """Cosine similarity of every row with a vectorised query"""
+        columns, weights = vector
+        # Terms added to the vocabulary by later segments have no entries here
+        known = columns < len(self.column_ptr) - 1
+        columns, weights = columns[known], weights[known]
+        if not len(columns):
+            return np.zeros(self.n_rows, dtype=np.float64)
+        starts = self.column_ptr[columns]
+        ends = self.column_ptr[columns + 1]
+        rows = np.concatenate([self.rows[start:end] for start, end in zip(starts, ends)])
+        values = np.concatenate([
+            self.values[start:end] * weight for start, end, weight in zip(starts, ends, weights)
+        ])
+        return np.bincount(rows, weights=values, minlength=self.n_rows)
+
+class MatrixSegment:
+    """Rows added to the engine in one go, covering resumes up to ``generation``"""
+
+    def __init__(self, resume_ids: List, skills: TfidfMatrix, text: TfidfMatrix, generation: int):
+        self.resume_ids = resume_ids
+        self.skills = skills
+        self.text = text
+        self.generation = generation
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple], generation: int,
+              previous: Optional['MatrixSegment'] = None) -> 'MatrixSegment':
+        resume_ids, skills_docs, text_docs = [], [], []
+        for resume_id, skills, extracted_text in rows:
+            resume_ids.append(resume_id)
+            skills_docs.append(skills)
+            text_docs.append(f"{skills} {extracted_text}")
+        return cls(
+            resume_ids,
+            TfidfMatrix.build(skills_docs, previous.skills if previous else None),
+            TfidfMatrix.build(text_docs, previous.text if previous else None),
+            generation
+        )
+
+class JobMatchEngine:
+    """In-memory skills and full-text TF-IDF matrices over the ready resumes.
+
+    The first segment fixes the idf of its terms. Resumes that arrive later are
+    appended as small segments that keep it and add their new terms to the
+    vocabulary, so new uploads rarely force a rebuild. Deletes, edits of indexed
+    resumes or too much growth do, and a rebuild starts a new ``epoch`` whose
+    scores are not comparable to the old one.
+    """
+
+    def __init__(self, segments: List[MatrixSegment], epoch: int):
+        self.segments = segments
+        self.epoch = epoch
+        self.resume_ids = [resume_id for segment in segments for resume_id in segment.resume_ids]
+        self.indexed = set(self.resume_ids)
+
+    @property
+    def generation(self) -> int:
+        return self.segments[-1].generation
+
+    @property
+    def base(self) -> MatrixSegment:
+        return self.segments[0]
+
+    @property
+    def latest(self) -> MatrixSegment:
+        """Segment with the largest vocabulary, used to vectorise queries"""
+        return self.segments[-1]
+
+    @classmethod
+    def build(cls, generation: int) -> 'JobMatchEngine':
+        rows = indexable_resumes().filter(generation__lte=generation).order_by('created_at', 'id')
+        segment = MatrixSegment.build(rows.iterator(chunk_size=2000), generation)
+        return cls([segment], epoch=generation)
+
+    def extended(self, rows: List[Tuple], generation: int) -> 'JobMatchEngine':
+        segment = MatrixSegment.build(rows, generation, self.latest)
+        return JobMatchEngine(self.segments + [segment], self.epoch)
+
+    def needs_rebuild(self, new_rows: List[Tuple]) -> bool:
+        appended = len(self.resume_ids) - len(self.base.resume_ids) + len(new_rows)
+        return (
+            any(resume_id in self.indexed for resume_id, _, _ in new_rows)
+            or appended > REBUILD_FRACTION * len(self.base.resume_ids)
+        )
+
+    def top(self, job_requirements: str, top_n: int, since_generation: int = -1,
+            candidates: Optional[Container] = None) -> List[Tuple[object, float]]:
+        """Best (resume_id, score) pairs above the minimum threshold, best first.
+
+        With since_generation only segments added after that generation are
+        scored; with candidates, resumes outside that set of ids score zero.
+        """
+        segments = [segment for segment in self.segments if segment.generation > since_generation]
+        if not segments:
+            return []
+        skills_query = self.latest.skills.vectorize(job_requirements)
+        text_query = self.latest.text.vectorize(job_requirements)
+        scores = np.concatenate([
+            SKILLS_WEIGHT * segment.skills.dot(skills_query) + TEXT_WEIGHT * segment.text.dot(text_query)
+            for segment in segments
+        ])
+        resume_ids = [resume_id for segment in segments for resume_id in segment.resume_ids]
+        if not len(scores):
+            return []
+        if candidates is not None:
+            scores[~np.fromiter((resume_id in candidates for resume_id in resume_ids), bool, len(resume_ids))] = 0
+        if top_n < len(scores):
+            best = np.argpartition(-scores, top_n - 1)[:top_n]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [
+            (resume_ids[row], float(scores[row]))
+            for row in best if scores[row] > MIN_MATCH_SCORE
+        ]
+
+_engine: Optional[JobMatchEngine] = None
+_engine_lock = threading.Lock()
+
+def indexable_resumes():
+    """Rows the engines score; uploads still processing have no text yet"""
+    return Resume.objects.filter(status=Resume.STATUS_READY).values_list('id', 'skills', 'extracted_text')
+
+def get_match_engine(generation: int, last_removal: int) -> JobMatchEngine:
+    """Return the process-wide engine brought up to date with the corpus generation"""
+    global _engine
+    engine = _engine
+    if engine is not None and engine.generation == generation:
+        return engine
+    with _engine_lock:
+        engine = _engine
+        if engine is not None and engine.generation == generation:
+            return engine
+        if engine is None or last_removal > engine.generation:
+            engine = JobMatchEngine.build(generation)
+        else:
+            new_rows = list(indexable_resumes().filter(
+                generation__gt=engine.generation, generation__lte=generation
+            ))
+            if engine.needs_rebuild(new_rows):
+                engine = JobMatchEngine.build(generation)
+            else:
+                engine = engine.extended(new_rows, generation)
+        _engine = engine
+        return engine
+
+def reset_match_engine():
+    """Drop the process-wide engine so the next match rebuilds it"""
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+# Columns the fuzzy scorers read for every resume
+SCORED_FIELDS = ('id', 'skills', 'extracted_text')
+
+def match_rows(ranked: List[Tuple[object, float]]):
+    """Rows with the fields needed to build match results for ranked resumes"""
+    return Resume.objects.filter(id__in=[resume_id for resume_id, _ in ranked]).values(
+        'id', 'name', 'email', 'skills', 'extracted_text'
+    )
+
+def build_matches(job_requirements: str, ranked: List[Tuple[object, float]],
+                  rows: Optional[Iterable[Dict]] = None) -> List[Dict]:
+    """Build the match results of the ranked resumes, best first (fetching their rows unless given)"""
+    by_id = {row['id']: row for row in (match_rows(ranked) if rows is None else rows)}
+    job_skills = extract_job_skills(job_requirements)
+    return [
+        build_job_match(job_requirements, by_id[resume_id], score, job_skills)
+        for resume_id, score in ranked if resume_id in by_id
+    ]
+
+def ready_resumes(generation: int, since_generation: int = -1):
+    """Ready resumes up to generation (and written after since_generation), in scoring order"""
+    resumes = Resume.objects.filter(status=Resume.STATUS_READY, generation__lte=generation)
+    if since_generation >= 0:
+        resumes = resumes.filter(generation__gt=since_generation)
+    # Deterministic order so ties rank the same as in the sharded scorer
+    return resumes.order_by('-created_at', '-id')
+
+def uses_sharded_scorer(since_generation: int, candidates: Optional[Container]) -> bool:
+    # New resumes alone are few enough to score serially, and so are filtered candidates
+    return settings.JOB_MATCH_ENGINE == 'sharded' and since_generation < 0 and candidates is None
+
+def sharded_top(job_requirements: str, top_n: int, generation: int, last_removal: int,
+                progress: Optional[ScoringProgress]) -> Optional[List[Tuple[object, float]]]:
+    """Ranked pairs from the sharded scorer, or None when its workers died"""
+    try:
+        return get_sharded_scorer().top(job_requirements, top_n, generation, last_removal, progress)
+    except BrokenProcessPool:
+        logger.exception('Sharded scoring failed, falling back to serial scoring')
+        reset_sharded_scorer()
+        if progress:
+            progress.scored = progress.total = 0
+        return None
+
+def score_resumes(job_requirements: str, top_n: int, generation: int, last_removal: int,
+                  since_generation: int = -1, progress: Optional[ScoringProgress] = None,
+                  candidates: Optional[Container] = None):
+    """Score the corpus (or only resumes written after since_generation, or only candidates).
+
+    Returns (matches, epoch); the epoch identifies the scoring basis so cached
+    and freshly scored matches are only merged when they are comparable.
+    """
+    ranked, epoch = None, None
+    if settings.JOB_MATCH_ENGINE == 'tfidf':
+        with span('engine'):
+            engine = get_match_engine(generation, last_removal)
+        with span('score'):
+            ranked = engine.top(job_requirements, top_n, since_generation, candidates)
+        # One vectorised pass over every row: the budget does not apply
+        if progress:
+            progress.total = progress.scored = len(engine.resume_ids) if candidates is None else len(candidates)
+        epoch = engine.epoch
+    elif uses_sharded_scorer(since_generation, candidates):
+        with span('score'):
+            ranked = sharded_top(job_requirements, top_n, generation, last_removal, progress)
+
+    if ranked is None:
+        with span('fetch'):
+            rows = fetch_within_budget(ready_resumes(generation, since_generation), SCORED_FIELDS, progress, candidates)
+        with span('score'):
+            scored = rank_job_matches(job_requirements, rows, top_n, progress, candidates)
+        ranked = [(row['id'], score) for score, row in scored]
+    with span('evidence'):
+        return build_matches(job_requirements, ranked), epoch
+
+async def ascore_resumes(pool, job_requirements: str, top_n: int, generation: int, last_removal: int,
+                         since_generation: int = -1, progress: Optional[ScoringProgress] = None,
+                         candidates: Optional[Container] = None):
+    """score_resumes for the async views, awaiting the reads.
+
+    Only engine builds, scoring and evidence are submitted to ``pool``, whose
+    place the caller holds.
+    """
+    ranked, epoch = None, None
+    if settings.JOB_MATCH_ENGINE == 'tfidf':
+        with span('engine'):
+            engine = await pool.submit(get_match_engine, generation, last_removal)
+        with span('score'):
+            ranked = await pool.submit(engine.top, job_requirements, top_n, since_generation, candidates)
+        # One vectorised pass over every row: the budget does not apply
+        if progress:
+            progress.total = progress.scored = len(engine.resume_ids) if candidates is None else len(candidates)
+        epoch = engine.epoch
+    elif uses_sharded_scorer(since_generation, candidates):
+        with span('score'):
+            ranked = await pool.submit(sharded_top, job_requirements, top_n, generation, last_removal, progress)
+
+    if ranked is None:
+        with span('fetch'):
+            rows = await sync_to_async(fetch_within_budget)(
+                ready_resumes(generation, since_generation), SCORED_FIELDS, progress, candidates
+            )
+        with span('score'):
+            scored = await pool.submit(rank_job_matches, job_requirements, rows, top_n, progress, candidates)
+        ranked = [(row['id'], score) for score, row in scored]
+    with span('evidence'):
+        rows = [row async for row in match_rows(ranked)]
+        return await pool.submit(build_matches, job_requirements, ranked, rows), epoch
+
+def job_cache_key(job) -> str:
+    return f'job_match:{job.id}'
+
+def usable_cache(cached: Optional[Dict], job, top_n: int, generation: int, last_removal: int) -> bool:
+    """Whether a cached run can be returned or extended for this request"""
+    return (
+        cached is not None
+        and cached['engine'] == settings.JOB_MATCH_ENGINE
+        and cached['job_updated_at'] == job.updated_at
+        and cached['top_n'] >= top_n
+        and cached['generation'] <= generation
+        and last_removal <= cached['generation']
+    )
+
+def new_resume_ids(since_generation: int, generation: int):
+    return Resume.objects.filter(
+        generation__gt=since_generation, generation__lte=generation
+    ).values_list('id', flat=True)
+
+def merge_new_matches(cached: Dict, new_matches: List[Dict], epoch, new_ids: Set) -> Optional[List[Dict]]:
+    """The cached top-N updated with newly scored resumes, or None if only a full pass is right"""
+    cached_ids = {match['resume_id'] for match in cached['matches']}
+    # A rescored resume that was already in the cached top-N may have dropped out
+    # of it, leaving a gap only a full pass can fill
+    if epoch != cached['epoch'] or new_ids & cached_ids:
+        return None
+    matches = sorted(cached['matches'] + new_matches, key=lambda match: match['match_score'], reverse=True)
+    return matches[:cached['top_n']]
+
+def cache_entry(job, top_n: int, generation: int, epoch, matches: List[Dict]) -> Dict:
+    return {
+        'engine': settings.JOB_MATCH_ENGINE,
+        'job_updated_at': job.updated_at,
+        'top_n': top_n,
+        'generation': generation,
+        'epoch': epoch,
+        'matches': matches,
+    }
+
+def match_job(job, top_n: int, progress: Optional[ScoringProgress] = None,
+              candidates: Optional[Container] = None) -> Tuple[List[Dict], str]:
+    """Top matches for a job, reusing the cached run where possible.
+
+    Returns (matches, cache_status) where cache_status is 'hit' (nothing
+    changed), 'incremental' (only resumes added since the cached run were
+    scored and merged) or 'miss' (the whole corpus was scored). Runs
+    restricted to a candidates set are never cached.
+    """
+    job_requirements = f"{job.description} {job.requirements}"
+    generation, last_removal = CorpusState.current()
+    if candidates is not None:
+        matches, _ = score_resumes(job_requirements, top_n, generation, last_removal,
+                                   progress=progress, candidates=candidates)
+        return matches, 'miss'
+    with span('cache'):
+        cached = cache.get(job_cache_key(job))
+    if not usable_cache(cached, job, top_n, generation, last_removal):
+        cached = None
+    elif cached['generation'] == generation:
+        if progress:
+            progress.total = progress.scored = 0
+        return cached['matches'][:top_n], 'hit'
+
+    matches = None
+    if cached:
+        new_matches, epoch = score_resumes(
+            job_requirements, cached['top_n'], generation, last_removal,
+            since_generation=cached['generation'], progress=progress
+        )
+        new_ids = set(new_resume_ids(cached['generation'], generation))
+        matches = merge_new_matches(cached, new_matches, epoch, new_ids)
+    if matches is not None:
+        cache_status, cached_top_n = 'incremental', cached['top_n']
+    else:
+        cache_status, cached_top_n = 'miss', top_n
+        matches, epoch = score_resumes(job_requirements, top_n, generation, last_removal, progress=progress)
+
+    if not (progress and progress.partial):
+        with span('cache'):
+            cache.set(job_cache_key(job), cache_entry(job, cached_top_n, generation, epoch, matches),
+                      settings.JOB_MATCH_CACHE_TIMEOUT)
+    return matches[:top_n], cache_status
+
+async def amatch_job(pool, job, top_n: int, progress: Optional[ScoringProgress] = None,
+                     candidates: Optional[Container] = None) -> Tuple[List[Dict], str]:
+    """match_job for the async views, scoring on ``pool`` through ascore_resumes"""
+    job_requirements = f"{job.description} {job.requirements}"
+    generation, last_removal = await CorpusState.acurrent()
+    if candidates is not None:
+        matches, _ = await ascore_resumes(pool, job_requirements, top_n, generation, last_removal,
+                                          progress=progress, candidates=candidates)
+        return matches, 'miss'
+    with span('cache'):
+        cached = await cache.aget(job_cache_key(job))
+    if not usable_cache(cached, job, top_n, generation, last_removal):
+        cached = None
+    elif cached['generation'] == generation:
+        if progress:
+            progress.total = progress.scored = 0
+        return cached['matches'][:top_n], 'hit'
+
+    matches = None
+    if cached:
+        new_matches, epoch = await ascore_resumes(
+            pool, job_requirements, cached['top_n'], generation, last_removal,
+            since_generation=cached['generation'], progress=progress
+        )
+        new_ids = {resume_id async for resume_id in new_resume_ids(cached['generation'], generation)}
+        matches = merge_new_matches(cached, new_matches, epoch, new_ids)
+    if matches is not None:
+        cache_status, cached_top_n = 'incremental', cached['top_n']
+    else:
+        cache_status, cached_top_n = 'miss', top_n
+        matches, epoch = await ascore_resumes(pool, job_requirements, top_n, generation, last_removal,
+                                              progress=progress)
+
+    if not (progress and progress.partial):
+        with span('cache'):
+            await cache.aset(job_cache_key(job), cache_entry(job, cached_top_n, generation, epoch, matches),
+                             settings.JOB_MATCH_CACHE_TIMEOUT)
+    return matches[:top_n], cache_status
+
+# bulk_create arguments that upsert JobMatch rows in one statement
+JOB_MATCH_UPSERT = {
+    'update_conflicts': True,
+    'unique_fields': ['job', 'resume'],
+    'update_fields': ['match_score', 'matched_skills', 'missing_requirements', 'evidence_snippets'],
+}
+
+def job_match_rows(job, matches: List[Dict]) -> List[JobMatch]:
+    """Unsaved JobMatch rows for the results of a match run"""
+    return [
+        JobMatch(
+            job=job,
+            resume_id=match_data['resume_id'],
+            match_score=match_data['match_score'],
+            matched_skills=', '.join(match_data['matched_skills']),
+            missing_requirements=' | '.join(match_data['missing_requirements']),
+            evidence_snippets=' | '.join(match_data['evidence_snippets'])
+        )
+        for match_data in matches
+    ]
@@ -1,11 +1,43 @@
+import json
+import logging
+import math
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.http import JsonResponse
 from django.core.cache import cache
 from django.contrib.auth.models import AnonymousUser
-import time
+
+from .timing import current_timer, timed_request
+
+timing_logger = logging.getLogger('api.timing')
+
+# (method, path pattern, cost in tokens); the first match wins, any other request costs 1
+ENDPOINT_COSTS = [
+    ('POST', re.compile(r'^/api/jobs/[^/]+/match/'), 10),
+    ('POST', re.compile(r'^/api/resumes/bulk/'), 10),
+    ('POST', re.compile(r'^/api/ask/'), 5),
+    ('POST', re.compile(r'^/api/resumes/$'), 2),
+]
+
+def request_cost(request) -> int:
+    for method, pattern, cost in ENDPOINT_COSTS:
+        if request.method == method and pattern.match(request.path):
+            return cost
+    return 1
 
 class RateLimitMiddleware:
-    """Rate limiting middleware - 60 requests per minute per user"""
-    
+    """Sliding-window rate limiting - RATE_LIMIT_TOKENS per RATE_LIMIT_WINDOW seconds per user.
+
+    Each client has one counter per fixed window. A request is allowed while
+    the current window's count plus the previous window's count, weighted by
+    how much of it the sliding window still covers, stays within the limit.
+    Counters only change through cache.add/incr, so the state is two integers
+    per client and the check is atomic on a shared cache such as Redis.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
 
@@ -20,29 +52,110 @@ class RateLimitMiddleware:
         else:
             user_id = f"user_{request.user.id}"
 
-        # Create cache key
-        cache_key = f"rate_limit_{user_id}"
-        current_time = int(time.time())
-        window_start = current_time - 60  # 1 minute window
+        limit = settings.RATE_LIMIT_TOKENS
+        window = settings.RATE_LIMIT_WINDOW
+        cost = request_cost(request)
+        now = time.time()
+        window_index = int(now // window)
+        cache_key = f"rate_limit:{user_id}:{window_index}"
 
-        # Get current requests in the window
-        requests = cache.get(cache_key, [])
-        
-        # Filter out requests older than 1 minute
-        requests = [req_time for req_time in requests if req_time > window_start]
+        # Charge first, then check: concurrent requests each see their own total
+        if cache.add(cache_key, cost, window * 2):
+            used = cost
+        else:
+            try:
+                used = cache.incr(cache_key, cost)
+            except ValueError:  # Expired between add and incr
+                cache.add(cache_key, cost, window * 2)
+                used = cost
+        previous = cache.get(f"rate_limit:{user_id}:{window_index - 1}", 0)
+        previous_weight = 1.0 - (now % window) / window
+        estimate = previous * previous_weight + used
+        reset = math.ceil(window - now % window)
 
         # Check if limit exceeded
-        if len(requests) >= 60:
-            return JsonResponse({
+        if estimate > limit:
+            # Rejected requests give their tokens back
+            try:
+                cache.decr(cache_key, cost)
+            except ValueError:  # Expired since it was charged; nothing to give back
+                pass
+            excess = estimate - limit
+            retry_after = reset if not previous else min(reset, math.ceil(excess * window / previous))
+            response = JsonResponse({
                 'error': {
                     'code': 'RATE_LIMIT',
-                    'message': 'Rate limit exceeded. Maximum 60 requests per minute.'
+                    'message': f'Rate limit exceeded. Maximum {limit} tokens per {window} seconds; '
+                               f'this request costs {cost}.'
                 }
             }, status=429)
+            response['Retry-After'] = str(max(retry_after, 1))
+            remaining = max(0, math.floor(limit - (estimate - cost)))
+        else:
+            response = self.get_response(request)
+            remaining = max(0, math.floor(limit - estimate))
+
+        response['X-RateLimit-Limit'] = str(limit)
+        response['X-RateLimit-Remaining'] = str(remaining)
+        response['X-RateLimit-Reset'] = str(reset)
+        response['X-RateLimit-Cost'] = str(cost)
+        return response
+
+class ServerTimingMiddleware:
+    """Per-stage request timings, enabled with REQUEST_TIMING.
+
+    Views mark stages with api.timing.span(); the durations, the query count
+    and time on the default database and the total are returned in a
+    Server-Timing header and logged as one JSON line on the api.timing
+    logger. When disabled, requests pass straight through and spans are
+    no-ops.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            # Served by the ASGI handler: stay async instead of being adapted through a thread
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.REQUEST_TIMING:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with timed_request() as timer:
+            response = self.get_response(request)
+        return self.finish(request, response, timer, start)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_TIMING:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with timed_request() as timer:
+            response = await self.get_response(request)
+        return self.finish(request, response, timer, start)
 
-        # Add current request
-        requests.append(current_time)
-        cache.set(cache_key, requests, 60)  # Cache for 1 minute
+    def finish(self, request, response, timer, start):
+        total = time.perf_counter() - start
+        response['Server-Timing'] = timer.server_timing(total)
+        timing_logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timer.record(total),
+        }, default=str))
+        return response
 
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that as its own stage
+        timer = current_timer()
+        if timer is not None:
+            start = time.perf_counter()
+            response.add_post_render_callback(lambda _: timer.add('render', time.perf_counter() - start))
+        return response
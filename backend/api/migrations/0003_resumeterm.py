@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:03
+
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the api.tokens tokenizer as of this migration, so later
+# tokenizer changes do not alter what the backfill writes
+TOKEN_PATTERN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'of', 'on', 'or', 'that', 'the', 'to', 'was',
+    'were', 'who', 'will', 'with', 'find', 'show', 'me', 'any', 'someone',
+    'candidate', 'candidates', 'resume', 'resumes',
+])
+
+
+def resume_terms(name, skills, extracted_text):
+    text = f"{name} {skills} {extracted_text}".lower()
+    return Counter(
+        token for token in TOKEN_PATTERN.findall(text)
+        if 1 < len(token) <= MAX_TERM_LENGTH and token not in STOP_WORDS
+    )
+
+
+def backfill_index(apps, schema_editor):
+    Resume = apps.get_model('api', 'Resume')
+    ResumeTerm = apps.get_model('api', 'ResumeTerm')
+    batch = []
+    for resume in Resume.objects.only('id', 'name', 'skills', 'extracted_text').iterator():
+        terms = resume_terms(resume.name, resume.skills, resume.extracted_text)
+        batch.extend(
+            ResumeTerm(term=term, resume_id=resume.id, frequency=frequency)
+            for term, frequency in terms.items()
+        )
+        if len(batch) >= 5000:
+            ResumeTerm.objects.bulk_create(batch, batch_size=1000)
+            batch = []
+    if batch:
+        ResumeTerm.objects.bulk_create(batch, batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_resume_email_alter_resume_extracted_text_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='api.resume')),
+            ],
+            options={
+                'unique_together': {('term', 'resume')},
+            },
+        ),
+        migrations.RunPython(backfill_index, migrations.RunPython.noop),
+    ]
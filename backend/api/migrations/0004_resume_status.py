@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_resumeterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='processing_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='status',
+            field=models.CharField(choices=[('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='ready', max_length=20),
+        ),
+    ]
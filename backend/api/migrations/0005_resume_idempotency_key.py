@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_resume_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='idempotency_key',
+            field=models.CharField(blank=True, db_index=True, max_length=255),
+        ),
+    ]
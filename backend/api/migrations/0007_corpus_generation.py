@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+def create_corpus_state(apps, schema_editor):
+    CorpusState = apps.get_model('api', 'CorpusState')
+    CorpusState.objects.get_or_create(pk=1)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_extraction_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorpusState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.BigIntegerField(default=0)),
+                ('last_removal', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='generation',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(create_corpus_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_corpus_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractioncache',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='extractioncache',
+            name='truncated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='extractioncache',
+            name='truncation_reason',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='truncated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='truncation_reason',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+    ]
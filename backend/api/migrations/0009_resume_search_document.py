@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:18
+
+from django.db import migrations, models
+
+# Frozen copy of api.utils.build_search_document as of this migration, so
+# later normalization changes do not alter what the backfill writes
+def build_search_document(name, skills, extracted_text):
+    return ' '.join(sorted(f"{name} {skills} {extracted_text}".lower().split()))
+
+
+def backfill_search_document(apps, schema_editor):
+    Resume = apps.get_model('api', 'Resume')
+    batch = []
+    for resume in Resume.objects.only('id', 'name', 'skills', 'extracted_text').iterator():
+        resume.search_document = build_search_document(resume.name, resume.skills, resume.extracted_text)
+        batch.append(resume)
+        if len(batch) >= 500:
+            Resume.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Resume.objects.bulk_update(batch, ['search_document'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_extraction_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+import uuid
+
+from django.db import DatabaseError, migrations
+
+# Frozen copy of the api.fulltext table layouts as of this migration
+FTS_TABLE = 'api_resume_fts'
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "resume_id UNINDEXED, name, email, skills, extracted_text, tokenize='unicode61')",
+]
+SQLITE_INSERT = (
+    f'INSERT INTO {FTS_TABLE} (rowid, resume_id, name, email, skills, extracted_text) '
+    'VALUES (%s, %s, %s, %s, %s, %s)'
+)
+
+POSTGRES_DDL = [
+    f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} ('
+    'resume_id uuid PRIMARY KEY REFERENCES api_resume (id) ON DELETE CASCADE, '
+    'document tsvector NOT NULL)',
+    f'CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document ON {FTS_TABLE} USING GIN (document)',
+]
+POSTGRES_INSERT = (
+    f'INSERT INTO {FTS_TABLE} (resume_id, document) VALUES (%s, '
+    "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'D')) "
+    'ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document'
+)
+
+def sqlite_row(resume):
+    resume_id = uuid.UUID(str(resume.id))
+    return (resume_id.int & ((1 << 63) - 1), resume_id.hex, resume.name, resume.email,
+            resume.skills, resume.extracted_text)
+
+def postgres_row(resume):
+    return (resume.id, resume.name, resume.email, resume.skills, resume.extracted_text)
+
+LAYOUTS = {
+    'sqlite': (SQLITE_DDL, SQLITE_INSERT, sqlite_row),
+    'postgresql': (POSTGRES_DDL, POSTGRES_INSERT, postgres_row),
+}
+
+def create_fulltext_table(apps, schema_editor):
+    layout = LAYOUTS.get(schema_editor.connection.vendor)
+    if layout is None:
+        return
+    ddl, insert, row = layout
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            for statement in ddl:
+                cursor.execute(statement)
+    except DatabaseError:
+        # No full-text support in this database build; searches fall back to LIKE
+        return
+
+    Resume = apps.get_model('api', 'Resume')
+    queryset = Resume.objects.only('id', 'name', 'email', 'skills', 'extracted_text')
+    batch = []
+    with schema_editor.connection.cursor() as cursor:
+        for resume in queryset.iterator(chunk_size=500):
+            batch.append(row(resume))
+            if len(batch) >= 500:
+                cursor.executemany(insert, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+
+def drop_fulltext_table(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_resume_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_table, drop_fulltext_table),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of api.skills.split_skills without the taxonomy lookup, so the
+# backfill does not depend on the skill list in use when it runs. Extracted
+# skills are already canonical names; rebuild_search_index re-links the rest
+# through the current taxonomy's aliases.
+SKILL_NAME_LENGTH = 100
+
+
+def split_skills(skills):
+    found = {}
+    for skill in (skills or '').split(','):
+        name = ' '.join(skill.split())[:SKILL_NAME_LENGTH]
+        if name:
+            found.setdefault(name.lower(), name)
+    return found
+
+
+def backfill_resume_skills(apps, schema_editor):
+    Resume = apps.get_model('api', 'Resume')
+    Skill = apps.get_model('api', 'Skill')
+    ResumeSkill = apps.get_model('api', 'ResumeSkill')
+    ids = {}
+    links = []
+    for resume_id, skills in Resume.objects.values_list('id', 'skills').iterator():
+        for key, name in split_skills(skills).items():
+            if key not in ids:
+                ids[key] = Skill.objects.create(key=key, name=name).id
+            links.append(ResumeSkill(resume_id=resume_id, skill_id=ids[key]))
+        if len(links) >= 5000:
+            ResumeSkill.objects.bulk_create(links)
+            links = []
+    ResumeSkill.objects.bulk_create(links)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumeSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='api.resume')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resume_links', to='api.skill')),
+            ],
+            options={
+                'unique_together': {('skill', 'resume')},
+            },
+        ),
+        migrations.RunPython(backfill_resume_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:45
+
+import re
+from datetime import date
+
+from django.db import migrations, models
+
+# Frozen copy of api.utils.extract_experience_years as of this migration, so
+# later changes to the extraction do not alter what the backfill writes
+STATED_YEARS_PATTERNS = [
+    re.compile(r'(\d+[\+]?)\s*years?\s*(?:of\s*)?(?:experience|exp)'),
+    re.compile(r'experience[:]\s*(\d+[\+]?)\s*years?'),
+]
+MONTHS = {month: number for number, month in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1
+)}
+_MONTH = r'(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?'
+DATE_RANGE_PATTERN = re.compile(
+    _MONTH + r'((?:19|20)\d{2})\s*(?:[-–—]|to)\s*' + _MONTH + r'((?:19|20)\d{2}|present|current|now|today)\b'
+)
+EDUCATION_LINE_PATTERN = re.compile(
+    r'\b(?:university|college|school|institute|academy|bachelor|master|degree|diploma|b\.?sc|m\.?sc|'
+    r'b\.?eng|m\.?eng|b\.?tech|m\.?tech|ph\.?d|mba|education)\b'
+)
+MAX_EXPERIENCE_YEARS = 60
+
+
+def employment_intervals(text, today):
+    now = today.year * 12 + today.month - 1
+    intervals = []
+    for match in DATE_RANGE_PATTERN.finditer(text):
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.end())
+        if EDUCATION_LINE_PATTERN.search(text, line_start, line_end if line_end != -1 else len(text)):
+            continue
+        start_month, start_year, end_month, end_year = match.groups()
+        start = int(start_year) * 12 + MONTHS.get(start_month, 1) - 1
+        end = now if not end_year.isdigit() else int(end_year) * 12 + MONTHS.get(end_month, 1) - 1
+        if start <= end <= now:
+            intervals.append((start, end))
+    return intervals
+
+
+def extract_experience_years(text, today):
+    text = text.lower()
+    months = 0
+    current_start = current_end = None
+    for start, end in sorted(employment_intervals(text, today)):
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            months += current_end - current_start
+        current_start, current_end = start, end
+    if current_end is not None:
+        months += current_end - current_start
+
+    stated = [
+        int(match.rstrip('+')) for pattern in STATED_YEARS_PATTERNS for match in pattern.findall(text)
+    ]
+    years = max([months / 12, *stated])
+    return round(float(min(years, MAX_EXPERIENCE_YEARS)), 1)
+
+
+def backfill_experience_years(apps, schema_editor):
+    today = date.today()
+    Resume = apps.get_model('api', 'Resume')
+    batch = []
+    for resume in Resume.objects.only('id', 'extracted_text').iterator():
+        resume.experience_years = extract_experience_years(resume.extracted_text, today)
+        batch.append(resume)
+        if len(batch) >= 500:
+            Resume.objects.bulk_update(batch, ['experience_years'])
+            batch = []
+    if batch:
+        Resume.objects.bulk_update(batch, ['experience_years'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_skill_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractioncache',
+            name='experience_years',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='experience_years',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_experience_years, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+import api.fields
+
+MODELS = ('Resume', 'ExtractionCache')
+
+def copy_text(apps, source, target):
+    for model_name in MODELS:
+        model = apps.get_model('api', model_name)
+        batch = []
+        for row in model.objects.only('pk', source).iterator(chunk_size=1000):
+            setattr(row, target, getattr(row, source))
+            batch.append(row)
+            if len(batch) >= 1000:
+                model.objects.bulk_update(batch, [target])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [target])
+
+def compress_existing_text(apps, schema_editor):
+    copy_text(apps, 'extracted_text', 'compressed_text')
+
+def decompress_existing_text(apps, schema_editor):
+    copy_text(apps, 'compressed_text', 'extracted_text')
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_experience_years'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extractioncache',
+            name='compressed_text',
+            field=api.fields.CompressedTextField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='compressed_text',
+            field=api.fields.CompressedTextField(blank=True, default=''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(compress_existing_text, decompress_existing_text),
+        migrations.RemoveField(
+            model_name='extractioncache',
+            name='extracted_text',
+        ),
+        migrations.RemoveField(
+            model_name='resume',
+            name='extracted_text',
+        ),
+        migrations.RenameField(
+            model_name='extractioncache',
+            old_name='compressed_text',
+            new_name='extracted_text',
+        ),
+        migrations.RenameField(
+            model_name='resume',
+            old_name='compressed_text',
+            new_name='extracted_text',
+        ),
+    ]
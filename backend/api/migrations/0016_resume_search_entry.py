@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_compressed_extracted_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSearchEntry',
+            fields=[
+                ('resume', models.OneToOneField(db_column='resume_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='api.resume')),
+            ],
+            options={
+                'db_table': 'api_resume_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,27 +1,149 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 import uuid
 
+from .fields import CompressedTextField
+from .utils import build_search_document
+
+class CorpusState(models.Model):
+    """Single-row counters versioning the resume corpus.
+
+    ``generation`` increases on every resume write that changes one of
+    ``Resume.CORPUS_FIELDS`` and on every delete, and
+    ``last_removal`` records the generation of the latest delete, so caches
+    built at generation G can tell whether only new resumes arrived since.
+    """
+    generation = models.BigIntegerField(default=0)
+    last_removal = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        """Return (generation, last_removal)"""
+        state = cls.objects.filter(pk=1).values_list('generation', 'last_removal').first()
+        return state or (0, 0)
+
+    @classmethod
+    async def acurrent(cls):
+        state = await cls.objects.filter(pk=1).values_list('generation', 'last_removal').afirst()
+        return state or (0, 0)
+
+    @classmethod
+    def advance(cls, removal=False) -> int:
+        """Bump the generation; call inside the transaction writing the resumes"""
+        changes = {'generation': F('generation') + 1}
+        if removal:
+            changes['last_removal'] = F('generation') + 1
+        if not cls.objects.filter(pk=1).update(**changes):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(**changes)
+        return cls.objects.values_list('generation', flat=True).get(pk=1)
+
 class Resume(models.Model):
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200, blank=True)
     email = models.EmailField(blank=True)
     phone = models.CharField(max_length=20, blank=True)
     file = models.FileField(upload_to='resumes/')
-    extracted_text = models.TextField(blank=True)
+    extracted_text = CompressedTextField(blank=True)
     skills = models.TextField(blank=True)  # Comma-separated skills
     experience = models.TextField(blank=True)
+    experience_years = models.FloatField(default=0, db_index=True)  # Total employment, merged date ranges
     education = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_READY, db_index=True)
+    processing_error = models.TextField(blank=True)
+    idempotency_key = models.CharField(max_length=255, blank=True, db_index=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the file
+    generation = models.BigIntegerField(default=0, db_index=True)  # CorpusState generation of the last write
+    page_count = models.PositiveIntegerField(default=0)  # PDF pages extracted
+    truncated = models.BooleanField(default=False)  # Extraction stopped at a size or time limit
+    truncation_reason = models.CharField(max_length=16, blank=True)  # 'pages', 'characters' or 'time'
+    search_document = models.TextField(blank=True, editable=False)  # Normalized name, skills and text for /ask
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Keyset pagination and the default ordering seek on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='api_resume_created_id_idx'),
+        ]
+
+    # Fields read by the match engines and in-memory indexes; only writes
+    # that change one of them advance the corpus generation
+    CORPUS_FIELDS = ('status', 'name', 'email', 'skills', 'extracted_text', 'experience_years')
 
     def __str__(self):
         return f"{self.name} - {self.email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_corpus_fields()
+        return instance
+
+    def _remember_corpus_fields(self):
+        deferred = self.get_deferred_fields()
+        self._corpus_values = {
+            field: getattr(self, field) for field in self.CORPUS_FIELDS if field not in deferred
+        }
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        # Deferred fields load through here; remember them as they are in the database
+        loaded = getattr(self, '_corpus_values', {})
+        deferred = self.get_deferred_fields()
+        for field in self.CORPUS_FIELDS:
+            if (fields is None or field in fields) and field not in deferred:
+                loaded[field] = getattr(self, field)
+        self._corpus_values = loaded
+
+    def corpus_changed(self, update_fields=None) -> bool:
+        """Whether saving would change what the engines see (always true for a new row)"""
+        if self._state.adding:
+            return True
+        loaded = getattr(self, '_corpus_values', {})
+        deferred = self.get_deferred_fields()
+        for field in self.CORPUS_FIELDS:
+            if update_fields is not None and field not in update_fields:
+                continue
+            if field in deferred:
+                continue  # Not loaded, so not written either
+            if field not in loaded or loaded[field] != getattr(self, field):
+                return True
+        return False
+
+    def refresh_search_document(self):
+        self.search_document = build_search_document(self.name, self.skills, self.extracted_text)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        changed = self.corpus_changed(update_fields)
+        self.corpus_write = changed  # Read by the post_save index handlers
+        self.refresh_search_document()
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_document', *(['generation'] if changed else [])}
+        if not changed:
+            # e.g. an error message or phone number: skip the CorpusState row lock
+            super().save(*args, **kwargs)
+        else:
+            # Stamp and write in one transaction so a reader never sees the new
+            # generation before the row that carries it
+            with transaction.atomic():
+                self.generation = CorpusState.advance()
+                super().save(*args, **kwargs)
+        self._remember_corpus_fields()
+
 class Job(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=200)
@@ -35,7 +157,10 @@ class Job(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='api_job_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -56,3 +181,70 @@ class JobMatch(models.Model):
 
     def __str__(self):
         return f"Match: {self.resume.name} -> {self.job.title} ({self.match_score:.2f})"
+
+class ExtractionCache(models.Model):
+    """Extraction results keyed by the SHA-256 of the uploaded file bytes"""
+    content_hash = models.CharField(max_length=64, unique=True)
+    extractor_version = models.PositiveIntegerField()
+    extracted_text = CompressedTextField(blank=True)
+    skills = models.TextField(blank=True)
+    experience = models.TextField(blank=True)
+    experience_years = models.FloatField(default=0)
+    page_count = models.PositiveIntegerField(default=0)
+    truncated = models.BooleanField(default=False)
+    truncation_reason = models.CharField(max_length=16, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} (v{self.extractor_version})"
+
+class ResumeTerm(models.Model):
+    """Inverted index posting: one row per (term, resume) pair"""
+    term = models.CharField(max_length=64)
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='terms')
+    frequency = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ['term', 'resume']
+
+    def __str__(self):
+        return f"{self.term} -> {self.resume_id} ({self.frequency})"
+
+class Skill(models.Model):
+    """A skill named on at least one resume (canonical taxonomy name where known)"""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)  # Lowercased name used for lookups
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+class ResumeSkill(models.Model):
+    """Resume <-> Skill link, kept in sync with Resume.skills"""
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='resume_links')
+
+    class Meta:
+        # Leading on skill, so "resumes with skill X" is an index range scan
+        unique_together = ['skill', 'resume']
+
+    def __str__(self):
+        return f"{self.skill_id} -> {self.resume_id}"
+
+class ResumeSearchEntry(models.Model):
+    """A resume's row in the full-text side table, joined by ``?q=`` searches.
+
+    The table is created by migration 0010 in a layout specific to the
+    database (api.fulltext); only the resume_id column both layouts share is
+    mapped, and rows are written with raw SQL by the full-text backend.
+    """
+    resume = models.OneToOneField(
+        Resume, on_delete=models.DO_NOTHING, primary_key=True, db_column='resume_id',
+        db_constraint=False, related_name='search_entry'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'api_resume_fts'
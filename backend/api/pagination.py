@@ -0,0 +1,113 @@
+import base64
+import binascii
+import json
+import uuid
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class KeysetPagination(LimitOffsetPagination):
+    """Limit/offset pagination with an opt-in keyset (cursor) mode on (created_at, id).
+
+    ``?cursor=<token>`` (or ``?pagination=cursor`` for the first page) returns
+    pages newest first by seeking past the last row seen, so deep pages cost
+    the same as the first and no COUNT(*) is run. Requests without either
+    parameter keep the ``count``/``next``/``previous`` limit/offset responses.
+    Views whose results are ranked rather than date ordered set
+    ``keyset_pagination = False`` on themselves for that request.
+    """
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+
+    def use_cursor(self, request, view) -> bool:
+        if not getattr(view, 'keyset_pagination', True):
+            return False
+        return (self.cursor_query_param in request.query_params
+                or request.query_params.get(self.mode_query_param) == 'cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.use_cursor(request, view)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        created_at, row_id, self.reverse = self.decode_cursor(request)
+
+        if created_at is None:
+            page_queryset = queryset.order_by('-created_at', '-id')
+        elif self.reverse:
+            # Walk back towards newer rows, then flip the page to newest first
+            page_queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=row_id)
+            ).order_by('created_at', 'id')
+        else:
+            page_queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=row_id)
+            ).order_by('-created_at', '-id')
+
+        page = list(page_queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if self.reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, created_at is not None
+        self.page = page
+        return page
+
+    def decode_cursor(self, request):
+        """(created_at, id, reverse) from the cursor parameter; (None, None, False) for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            created_at = parse_datetime(data['c'])
+            if created_at is None:
+                raise ValueError(data['c'])
+            return created_at, uuid.UUID(data['i']), bool(data.get('r'))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise ValidationError({'error': {'code': 'INVALID_CURSOR', 'message': 'Invalid pagination cursor'}})
+
+    def encode_cursor(self, instance, reverse: bool) -> str:
+        data = {'c': instance.created_at.isoformat(), 'i': str(instance.id)}
+        if reverse:
+            data['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode('ascii')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
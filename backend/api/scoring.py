@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+class ScoringPoolSaturated(Exception):
+    """Raised instead of queueing when the scoring pool has no room left"""
+
+def _run_in_worker(func: Callable, *args):
+    # Workers are long-lived threads with their own DB connections
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+class ScoringPool:
+    """Bounded thread pool that runs CPU-heavy scoring off the event loop.
+
+    At most ``workers`` calls run at once and ``max_queued`` more may wait;
+    anything beyond that is refused immediately with ScoringPoolSaturated so
+    a burst of match requests cannot pile up behind each other. A request
+    takes its place with ``reserve()`` before reading anything, then
+    ``submit()``s its scoring steps; ``run()`` does both for a single call.
+    """
+
+    def __init__(self, workers: int, max_queued: int):
+        self.workers = workers
+        self.capacity = workers + max_queued
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scoring')
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def reserve(self):
+        """Hold one of the pool's places for the duration of a request"""
+        with self.lock:
+            if self.pending >= self.capacity:
+                raise ScoringPoolSaturated()
+            self.pending += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    async def submit(self, func: Callable, *args):
+        """Run ``func`` on a worker thread; call while holding a reservation"""
+        loop = asyncio.get_running_loop()
+        # run_in_executor does not carry contextvars over; copy them so the
+        # request's spans and query counts see what the worker does
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, partial(context.run, _run_in_worker, func, *args))
+
+    async def run(self, func: Callable, *args):
+        with self.reserve():
+            return await self.submit(func, *args)
+
+_pool: Optional[ScoringPool] = None
+_pool_lock = threading.Lock()
+
+def get_scoring_pool() -> ScoringPool:
+    """Process-wide pool sized by SCORING_CONCURRENCY and SCORING_MAX_QUEUED"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ScoringPool(settings.SCORING_CONCURRENCY, settings.SCORING_MAX_QUEUED)
+        return _pool
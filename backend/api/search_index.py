@@ -0,0 +1,107 @@
+from collections import Counter
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+
+from .models import Resume, ResumeTerm
+from .snippets import TermHighlighter
+from .timing import span
+from .tokens import tokenize
+from .utils import ScoringProgress, build_search_result, fetch_within_budget, rank_resumes
+
+def resume_terms(name: str, skills: str, extracted_text: str) -> Counter:
+    """Count index terms over the searchable fields of a resume"""
+    return Counter(tokenize(f"{name} {skills} {extracted_text}"))
+
+def build_postings(resume) -> List[ResumeTerm]:
+    """Build (unsaved) posting rows for a single resume"""
+    terms = resume_terms(resume.name, resume.skills, resume.extracted_text)
+    return [
+        ResumeTerm(term=term, resume_id=resume.id, frequency=frequency)
+        for term, frequency in terms.items()
+    ]
+
+def index_resume(resume) -> int:
+    """Replace the postings of a resume, returning the number written"""
+    postings = build_postings(resume)
+    with transaction.atomic():
+        ResumeTerm.objects.filter(resume_id=resume.id).delete()
+        ResumeTerm.objects.bulk_create(postings, batch_size=1000)
+    return len(postings)
+
+def index_resumes(resumes: Iterable) -> int:
+    """Re-index many resumes, returning the number of postings written"""
+    return sum(index_resume(resume) for resume in resumes)
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Drop and rebuild the whole index from the Resume table"""
+    written = 0
+    with transaction.atomic():
+        ResumeTerm.objects.all().delete()
+        batch = []
+        queryset = Resume.objects.only('id', 'name', 'skills', 'extracted_text')
+        for resume in queryset.iterator(chunk_size=batch_size):
+            batch.extend(build_postings(resume))
+            if len(batch) >= 5000:
+                ResumeTerm.objects.bulk_create(batch, batch_size=1000)
+                written += len(batch)
+                batch = []
+        if batch:
+            ResumeTerm.objects.bulk_create(batch, batch_size=1000)
+            written += len(batch)
+    return written
+
+def candidate_resumes(query: str):
+    """Resumes sharing at least one index term with the query.
+
+    Candidates are ordered by the number of distinct query terms they
+    contain, so a time-budgeted scoring pass sees the most promising first.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return Resume.objects.none()
+    postings = ResumeTerm.objects.filter(term__in=terms)
+    hits = (
+        postings.filter(resume_id=OuterRef('pk'))
+        .order_by()
+        .values('resume_id')
+        .annotate(hits=Count('term'))
+        .values('hits')
+    )
+    return (
+        Resume.objects.filter(id__in=postings.values('resume_id'))
+        .annotate(term_hits=Subquery(hits))
+        .order_by('-term_hits', '-created_at')
+    )
+
+def result_rows(ranked: List[Tuple[float, Dict]]):
+    """Rows with the fields needed to build results for ranked resumes"""
+    return Resume.objects.filter(id__in=[row['id'] for _, row in ranked]).values(
+        'id', 'name', 'email', 'skills', 'extracted_text'
+    )
+
+def build_search_results(query: str, ranked: List[Tuple[float, Dict]], rows: Iterable[Dict]) -> List[Dict]:
+    by_id = {row['id']: row for row in rows}
+    highlighter = TermHighlighter(tokenize(query))
+    return [
+        build_search_result(by_id[row['id']], similarity, highlighter)
+        for similarity, row in ranked if row['id'] in by_id
+    ]
+
+def search_resumes(query: str, k: int, progress: Optional[ScoringProgress] = None,
+                   candidates: Optional[Container] = None) -> List[Dict]:
+    """Top k results for /ask.
+
+    Resumes sharing a term with the query (and in ``candidates``, if given)
+    are ranked on their stored search documents alone; the full rows and
+    evidence passages are only loaded and built for the k winners.
+    """
+    with span('candidates'):
+        rows = fetch_within_budget(candidate_resumes(query), ('id', 'search_document'), progress, candidates)
+    with span('score'):
+        ranked = rank_resumes(query, rows, k, progress, candidates)
+    with span('rows'):
+        rows = list(result_rows(ranked))
+    with span('snippets'):
+        return build_search_results(query, ranked, rows)
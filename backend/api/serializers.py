@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Resume, Job, JobMatch
+from .bitmap_index import FilterSyntaxError, parse_filter
+from .fieldsets import SparseFieldsetSerializerMixin
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -16,7 +18,7 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class ResumeSerializer(serializers.ModelSerializer):
+class ResumeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     uploaded_by = UserSerializer(read_only=True)
     file = serializers.FileField()
     name = serializers.CharField(required=False, allow_blank=True)
@@ -24,16 +26,30 @@ class ResumeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Resume
-        fields = '__all__'
-        read_only_fields = ('id', 'uploaded_by', 'created_at', 'updated_at', 'extracted_text')
+        # search_document is a normalized copy of the text kept for matching only
+        exclude = ('search_document',)
+        read_only_fields = (
+            'id', 'uploaded_by', 'created_at', 'updated_at', 'extracted_text',
+            'status', 'processing_error', 'idempotency_key', 'content_hash', 'generation',
+            'page_count', 'truncated', 'truncation_reason', 'experience_years'
+        )
+
+class ResumeStatusSerializer(serializers.ModelSerializer):
+    """Extraction progress of an uploaded resume"""
+    class Meta:
+        model = Resume
+        fields = (
+            'id', 'status', 'processing_error', 'skills', 'experience', 'experience_years',
+            'page_count', 'truncated', 'truncation_reason', 'updated_at'
+        )
 
-class ResumeListSerializer(serializers.ModelSerializer):
+class ResumeListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Simplified serializer for listing resumes"""
     class Meta:
         model = Resume
-        fields = ('id', 'name', 'email', 'phone', 'skills', 'created_at')
+        fields = ('id', 'name', 'email', 'phone', 'skills', 'experience_years', 'status', 'created_at')
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
 
     class Meta:
@@ -41,7 +57,7 @@ class JobSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('id', 'created_by', 'created_at', 'updated_at')
 
-class JobListSerializer(serializers.ModelSerializer):
+class JobListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Simplified serializer for listing jobs"""
     class Meta:
         model = Job
@@ -55,11 +71,24 @@ class JobMatchSerializer(serializers.ModelSerializer):
         model = JobMatch
         fields = '__all__'
 
-class AskQuerySerializer(serializers.Serializer):
+class CandidateFilterMixin(serializers.Serializer):
+    """Optional bitmap-index filter, e.g. ``python (django OR flask) NOT php years>=5``"""
+    filter = serializers.CharField(required=False, max_length=1000)
+
+    def validate_filter(self, value):
+        try:
+            parse_filter(value)
+        except FilterSyntaxError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+class AskQuerySerializer(CandidateFilterMixin):
     """Serializer for /api/ask endpoint"""
     query = serializers.CharField(max_length=500)
     k = serializers.IntegerField(default=5, min_value=1, max_value=20)
+    budget_ms = serializers.IntegerField(required=False, min_value=1, max_value=60000)
 
-class MatchJobSerializer(serializers.Serializer):
+class MatchJobSerializer(CandidateFilterMixin):
     """Serializer for /api/jobs/:id/match endpoint"""
-    top_n = serializers.IntegerField(default=10, min_value=1, max_value=50)
\ No newline at end of file
+    top_n = serializers.IntegerField(default=10, min_value=1, max_value=50)
+    budget_ms = serializers.IntegerField(required=False, min_value=1, max_value=60000)
@@ -0,0 +1,30 @@
+"""State and entry points of a job matching shard worker.
+
+Runs in spawned processes without Django: the parent sends the shard's
+resume rows once (and new rows as they arrive), then only job requirements.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .utils import ScoringProgress, rank_job_matches
+
+_rows: List[Dict] = []
+
+def order_key(row: Dict):
+    """Serial scoring order: newest first, ties broken by id"""
+    return row['created_at'], row['id']
+
+def load_rows(rows: List[Dict]) -> int:
+    global _rows
+    _rows = sorted(rows, key=order_key, reverse=True)
+    return len(_rows)
+
+def add_rows(rows: List[Dict]) -> int:
+    _rows.extend(rows)
+    _rows.sort(key=order_key, reverse=True)
+    return len(_rows)
+
+def score_shard(job_requirements: str, top_n: int, budget_ms: Optional[int]) -> Tuple[List[Tuple], int, int]:
+    """Top (resume id, score) pairs of this shard, plus how many rows were scored out of the total"""
+    progress = ScoringProgress(budget_ms)
+    ranked = rank_job_matches(job_requirements, _rows, top_n, progress)
+    return [(row['id'], score) for score, row in ranked], progress.scored, progress.total
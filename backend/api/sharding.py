@@ -0,0 +1,107 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import Resume
+from .shard_worker import add_rows, load_rows, order_key, score_shard
+from .utils import ScoringProgress
+
+logger = logging.getLogger(__name__)
+
+# What the workers score on and order by; results are built from the database for the winners
+SHARD_FIELDS = ('id', 'skills', 'extracted_text', 'created_at')
+
+def ready_rows():
+    return Resume.objects.filter(status=Resume.STATUS_READY).values(*SHARD_FIELDS)
+
+class ShardedScorer:
+    """Fuzzy job matching spread over one single-process pool per shard.
+
+    Each worker keeps its shard of resume rows in memory between requests,
+    so a match only ships the job requirements. Per-shard top-N lists are
+    merged in the serial scoring order, giving exactly the serial results.
+    """
+
+    def __init__(self, shards: int):
+        context = multiprocessing.get_context('spawn')
+        self.executors = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(shards)]
+        self.order: Dict = {}  # resume id -> order key, for every loaded row
+        self.generation: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def _distribute(self, rows: List[Dict], loader) -> None:
+        shards = [[] for _ in self.executors]
+        for index, row in enumerate(rows, start=len(self.order)):
+            shards[index % len(shards)].append(row)
+            self.order[row['id']] = order_key(row)
+        futures = [executor.submit(loader, shard) for executor, shard in zip(self.executors, shards) if shard]
+        for future in futures:
+            future.result()
+
+    def _sync(self, generation: int, last_removal: int) -> None:
+        if self.generation == generation:
+            return
+        new_rows = None
+        if self.generation is not None and last_removal <= self.generation:
+            new_rows = list(ready_rows().filter(generation__gt=self.generation, generation__lte=generation))
+            if any(row['id'] in self.order for row in new_rows):
+                new_rows = None  # An already loaded resume changed
+        if new_rows is None:
+            self.order = {}
+            self._distribute(list(ready_rows().filter(generation__lte=generation)), load_rows)
+        else:
+            self._distribute(new_rows, add_rows)
+        self.generation = generation
+
+    def top(self, job_requirements: str, top_n: int, generation: int, last_removal: int,
+            progress: Optional[ScoringProgress] = None) -> List[Tuple]:
+        """Best (resume id, score) pairs across the shards, best first"""
+        budget_ms = None
+        if progress and progress.deadline is not None:
+            budget_ms = max(1, int((progress.deadline - time.monotonic()) * 1000))
+        # Sync and submit under the lock so each worker scores the rows of this generation
+        with self.lock:
+            self._sync(generation, last_removal)
+            futures = [
+                executor.submit(score_shard, job_requirements, top_n, budget_ms) for executor in self.executors
+            ]
+
+        ranked = []
+        for future in futures:
+            shard_ranked, scored, total = future.result()
+            ranked.extend(shard_ranked)
+            if progress:
+                progress.scored += scored
+                progress.total += total
+        # Two stable sorts reproduce the serial order: by score, ties in scoring order
+        ranked.sort(key=lambda pair: self.order[pair[0]], reverse=True)
+        ranked.sort(key=lambda pair: pair[1], reverse=True)
+        return ranked[:top_n]
+
+    def shutdown(self) -> None:
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+_scorer: Optional[ShardedScorer] = None
+_scorer_lock = threading.Lock()
+
+def get_sharded_scorer() -> ShardedScorer:
+    """Process-wide scorer with JOB_MATCH_SHARDS workers, started on first use"""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = ShardedScorer(settings.JOB_MATCH_SHARDS)
+        return _scorer
+
+def reset_sharded_scorer() -> None:
+    """Drop the scorer (e.g. after a worker died) so the next match starts fresh workers"""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is not None:
+            _scorer.shutdown()
+            _scorer = None
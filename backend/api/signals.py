@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .fulltext import get_fulltext_backend
+from .models import CorpusState, Resume
+from .search_index import index_resume, index_resumes
+from .skill_index import index_resume_skills
+
+# Sent with resumes=[...] after Resume.objects.bulk_create, which skips post_save
+resumes_bulk_created = Signal()
+
+@receiver(post_save, sender=Resume)
+def update_resume_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the inverted index and skill links in sync with the Resume table"""
+    if raw or not getattr(instance, 'corpus_write', True):
+        return  # Nothing the indexes hold has changed
+    index_resume(instance)
+    get_fulltext_backend().index([instance])
+    if update_fields is None or 'skills' in update_fields:
+        index_resume_skills([instance])
+
+@receiver(resumes_bulk_created)
+def index_bulk_created_resumes(sender, resumes, **kwargs):
+    index_resumes(resumes)
+    get_fulltext_backend().index(resumes)
+    index_resume_skills(resumes)
+
+@receiver(post_delete, sender=Resume)
+def advance_generation_on_delete(sender, instance, **kwargs):
+    """Deletes run in the collector's transaction, like Resume.save"""
+    CorpusState.advance(removal=True)
+    get_fulltext_backend().remove([instance.id])
@@ -0,0 +1,59 @@
+from typing import Dict, Iterable
+
+from django.db import transaction
+
+from .models import Resume, ResumeSkill, Skill
+from .skills import skill_key, split_skills
+
+def skill_ids(names: Dict[str, str]) -> Dict[str, int]:
+    """Skill ids for {key: name}, creating the skills not seen before"""
+    ids = dict(Skill.objects.filter(key__in=names).values_list('key', 'id'))
+    missing = [Skill(key=key, name=name) for key, name in names.items() if key not in ids]
+    if missing:
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        ids.update(Skill.objects.filter(key__in=[skill.key for skill in missing]).values_list('key', 'id'))
+    return ids
+
+def index_resume_skills(resumes: Iterable) -> int:
+    """Replace the ResumeSkill rows of these resumes with their current skills"""
+    parsed = {resume.pk: split_skills(resume.skills) for resume in resumes}
+    if not parsed:
+        return 0
+    ids = skill_ids({key: name for names in parsed.values() for key, name in names.items()})
+    ResumeSkill.objects.filter(resume_id__in=parsed).delete()
+    links = [
+        ResumeSkill(resume_id=resume_id, skill_id=ids[key])
+        for resume_id, names in parsed.items() for key in names
+    ]
+    ResumeSkill.objects.bulk_create(links, batch_size=1000)
+    return len(links)
+
+def rebuild_skill_index(batch_size: int = 500) -> int:
+    """Rebuild every ResumeSkill row from Resume.skills"""
+    written = 0
+    with transaction.atomic():
+        ResumeSkill.objects.all().delete()
+        batch = []
+        for resume in Resume.objects.only('id', 'skills').iterator(chunk_size=batch_size):
+            batch.append(resume)
+            if len(batch) >= batch_size:
+                written += index_resume_skills(batch)
+                batch = []
+        written += index_resume_skills(batch)
+    return written
+
+def filter_by_skills(queryset, skills: Iterable[str]):
+    """Resumes having every one of the skills (names or aliases, any case).
+
+    The skills are resolved to ids with one indexed lookup, then each is an
+    indexed join on ResumeSkill; no resume text is scanned.
+    """
+    keys = {skill_key(skill) for skill in skills if skill.strip()}
+    if not keys:
+        return queryset
+    ids = list(Skill.objects.filter(key__in=keys).values_list('id', flat=True))
+    if len(ids) < len(keys):
+        return queryset.none()
+    for skill_id in ids:
+        queryset = queryset.filter(skill_links__skill_id=skill_id)
+    return queryset
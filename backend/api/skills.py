@@ -0,0 +1,142 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skills.json')
+
+# Skill names contain '+', '#' and '.', so word boundaries are spelled out
+# instead of using \b: "java" must not match inside "javascript", "c" not
+# inside "c++", "rest" not inside "interest" and "js" not inside "node.js".
+LEFT_BOUNDARY = r'(?<![\w+#.])'
+RIGHT_BOUNDARY = r'(?![\w+#])'
+# Text allowed between two mentions of a skill list: "Go, Rust", "C/C++", "Sales and Marketing"
+LIST_SEPARATOR = re.compile(r'\s*(?:[,;/|&]|\band\b|\bor\b)\s*', re.IGNORECASE)
+
+def _normalize(alias: str) -> str:
+    return ' '.join(alias.split())
+
+def _trie_pattern(node: Dict) -> str:
+    """Turn a character trie into a regex that shares common prefixes"""
+    alternatives = []
+    for char in sorted(key for key in node if key):
+        escaped = r'\s+' if char == ' ' else re.escape(char)
+        alternatives.append(escaped + _trie_pattern(node[char]))
+    if not alternatives:
+        return ''
+    optional = '' in node
+    if len(alternatives) == 1 and not optional:
+        return alternatives[0]
+    group = '(?:' + '|'.join(alternatives) + ')'
+    return group + '?' if optional else group
+
+def _build_trie(aliases: Iterable[str]) -> Dict:
+    trie: Dict = {}
+    for alias in aliases:
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return trie
+
+def trie_regex(words: Iterable[str]) -> str:
+    """Regex alternation of words, sharing prefixes so matching cost does not grow with the word count"""
+    return _trie_pattern(_build_trie(words))
+
+class SkillMatcher:
+    """Finds taxonomy skills in text with one compiled pattern and one pass.
+
+    Aliases match case-insensitively. Entries flagged ``case_sensitive`` (skill
+    names that are also ordinary words, like "Go" or "Express") only match
+    their canonical name with its exact capitalisation, and only inside a list
+    of skills: next to another skill mention, joined by a comma, slash, "and"
+    and the like. "Go, Rust" finds both; "Go-to person", "Plan C" and "Ada
+    Lovelace" find nothing.
+    """
+
+    def __init__(self, entries: List[Dict]):
+        self.by_alias: Dict[str, str] = {}
+        self.by_exact_name: Dict[str, str] = {}
+        for entry in entries:
+            name = entry['name']
+            if entry.get('case_sensitive'):
+                self.by_exact_name[_normalize(name)] = name
+            else:
+                self.by_alias[_normalize(name).lower()] = name
+            for alias in entry.get('aliases', []):
+                self.by_alias[_normalize(alias).lower()] = name
+        self.names = sorted({entry['name'] for entry in entries})
+
+        branches = []
+        if self.by_alias:
+            branches.append('(?i:' + trie_regex(self.by_alias) + ')')
+        if self.by_exact_name:
+            branches.append(trie_regex(self.by_exact_name))
+        self.pattern = re.compile(LEFT_BOUNDARY + '(?:' + '|'.join(branches or ['(?!)']) + ')' + RIGHT_BOUNDARY)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SkillMatcher':
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['skills'])
+
+    def __len__(self):
+        return len(self.names)
+
+    def canonical(self, skill: str) -> Optional[str]:
+        """Canonical taxonomy name for a skill or alias, if known"""
+        skill = _normalize(skill)
+        return self.by_exact_name.get(skill) or self.by_alias.get(skill.lower())
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, canonical name) of every skill mention in text"""
+        if not text:
+            return
+        mentions = []
+        for match in self.pattern.finditer(text):
+            name = self.canonical(match.group(0))
+            if name:
+                listed_only = _normalize(match.group(0)) in self.by_exact_name
+                mentions.append((match.start(), match.end(), name, listed_only))
+        for index, (start, end, name, listed_only) in enumerate(mentions):
+            if listed_only and not (
+                (index > 0 and self._listed(text, mentions[index - 1][1], start))
+                or (index + 1 < len(mentions) and self._listed(text, end, mentions[index + 1][0]))
+            ):
+                continue
+            yield start, end, name
+
+    @staticmethod
+    def _listed(text: str, end: int, start: int) -> bool:
+        """Whether two mentions are adjacent items of a list"""
+        return LIST_SEPARATOR.fullmatch(text, end, start) is not None
+
+    def find(self, text: str) -> List[str]:
+        """Canonical names of all skills mentioned in text, in order of first mention"""
+        found = {}
+        for _, _, name in self.finditer(text):
+            found.setdefault(name, None)
+        return list(found)
+
+@lru_cache(maxsize=None)
+def get_skill_matcher() -> SkillMatcher:
+    """Process-wide matcher, built on first use from SKILL_TAXONOMY_PATH"""
+    return SkillMatcher.from_file(os.environ.get('SKILL_TAXONOMY_PATH', DEFAULT_TAXONOMY_PATH))
+
+SKILL_NAME_LENGTH = 100  # Skill.name / Skill.key max_length
+
+def skill_key(skill: str) -> str:
+    """Lookup key for a skill or alias: its canonical name (or itself) lowercased"""
+    skill = _normalize(skill)
+    return (get_skill_matcher().canonical(skill) or skill).lower()[:SKILL_NAME_LENGTH]
+
+def split_skills(skills: str) -> Dict[str, str]:
+    """Skills of a comma-separated list as {key: name}, using canonical names where known"""
+    matcher = get_skill_matcher()
+    found: Dict[str, str] = {}
+    for skill in (skills or '').split(','):
+        skill = _normalize(skill)
+        if skill:
+            name = (matcher.canonical(skill) or skill)[:SKILL_NAME_LENGTH]
+            found.setdefault(name.lower(), name)
+    return found
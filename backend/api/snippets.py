@@ -0,0 +1,94 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from .skills import LEFT_BOUNDARY, RIGHT_BOUNDARY, trie_regex
+
+# A term occurrence: (start, end, term)
+Hit = Tuple[int, int, str]
+
+CONTEXT_CHARS = 60
+MAX_PASSAGE_CHARS = 240
+
+class TermHighlighter:
+    """Finds every occurrence of a set of terms in one case-insensitive pass over the text.
+
+    The terms are compiled into a single prefix-sharing pattern, so scanning
+    a resume costs the same however many terms the query has.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({term.lower() for term in terms if term})
+        self.pattern = re.compile(
+            LEFT_BOUNDARY + '(?i:' + trie_regex(self.terms) + ')' + RIGHT_BOUNDARY
+        ) if self.terms else None
+
+    def hits(self, text: str) -> List[Hit]:
+        if not self.pattern or not text:
+            return []
+        return [(match.start(), match.end(), match.group(0).lower()) for match in self.pattern.finditer(text)]
+
+class Passage(NamedTuple):
+    start: int
+    end: int
+    highlights: List[Tuple[int, int]]  # Term offsets relative to start
+    score: Tuple[int, float]  # (distinct terms, hits per 100 characters)
+
+def _snap(text: str, start: int, end: int, first_hit: int, last_hit: int) -> Tuple[int, int]:
+    """Move passage edges to whitespace so words are not cut in half"""
+    if start > 0:
+        space = text.find(' ', start, first_hit)
+        if space != -1:
+            start = space + 1
+    if end < len(text):
+        space = text.rfind(' ', last_hit, end)
+        if space != -1:
+            end = space
+    return start, end
+
+def best_passages(text: str, hits: List[Hit], max_passages: int = 3,
+                  context: int = CONTEXT_CHARS, max_length: int = MAX_PASSAGE_CHARS) -> List[Passage]:
+    """Best passages around the hits (which must be in text order), best first.
+
+    Each hit opens a window of ``context`` characters either side; overlapping
+    windows are merged up to ``max_length``. Passages are ranked by how many
+    distinct terms they contain, then by hits per character.
+    """
+    groups: List[List[Hit]] = []
+    bounds: List[List[int]] = []
+    for hit in hits:
+        start, end = max(0, hit[0] - context), min(len(text), hit[1] + context)
+        if bounds and start <= bounds[-1][1] and end - bounds[-1][0] <= max_length:
+            bounds[-1][1] = max(bounds[-1][1], end)
+            groups[-1].append(hit)
+        else:
+            if bounds and start < bounds[-1][1]:
+                # Too long to merge: split the overlap between the neighbouring hits
+                middle = (groups[-1][-1][1] + hit[0]) // 2
+                bounds[-1][1] = min(bounds[-1][1], middle)
+                start = max(start, middle)
+            bounds.append([start, end])
+            groups.append([hit])
+
+    passages = []
+    for (start, end), group in zip(bounds, groups):
+        start, end = _snap(text, start, end, group[0][0], group[-1][1])
+        score = (len({term for _, _, term in group}), 100.0 * len(group) / max(end - start, 1))
+        highlights = [(hit_start - start, hit_end - start) for hit_start, hit_end, _ in group]
+        passages.append(Passage(start, end, highlights, score))
+    passages.sort(key=lambda passage: passage.score, reverse=True)
+    return passages[:max_passages]
+
+def format_passage(text: str, passage: Passage) -> str:
+    return f"...{text[passage.start:passage.end].strip()}..."
+
+def passage_evidence(text: str, passages: List[Passage]) -> List[Dict]:
+    """JSON-ready passages with their character offsets and highlighted term offsets"""
+    return [
+        {
+            'text': text[passage.start:passage.end],
+            'start': passage.start,
+            'end': passage.end,
+            'highlights': [list(highlight) for highlight in passage.highlights],
+        }
+        for passage in passages
+    ]
@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import Future
+from datetime import date
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .bitmap_index import FilterSyntaxError, get_bitmap_index, parse_filter, reset_bitmap_index
+from .benchmarks.corpus import WRITERS, generate_resumes, write_pdf
+from .benchmarks.harness import compare
+from .fields import decompress_text
+from .fulltext import LikeBackend
+from .ingestion import _extraction_done, insert_bulk_batch
+from .matching import MIN_MATCH_SCORE, get_match_engine, reset_match_engine
+from .models import CorpusState, ExtractionCache, Job, JobMatch, Resume, ResumeTerm
+from .scoring import ScoringPool
+from .search_index import candidate_resumes
+from .skills import get_skill_matcher
+from .sharding import get_sharded_scorer, reset_sharded_scorer
+from .snippets import TermHighlighter, best_passages
+from .tokens import tokenize
+from .utils import (
+    EXTRACTOR_VERSION, ExtractionLimits, ScoringProgress, extract_document, extract_experience_years,
+    extract_resume_data, extract_text_from_file, rank_job_matches, rank_resumes, read_pdf_page
+)
+
+
+def create_resume(user, name, skills, text):
+    return Resume.objects.create(
+        name=name, email=f'{name.lower()}@example.com', file=f'resumes/{name}.txt',
+        skills=skills, extracted_text=text, uploaded_by=user
+    )
+
+
+class JobMatchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Generations restart with every test, so process-wide engines would be stale
+        reset_match_engine()
+        self.user = User.objects.create_user('recruiter', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.job = Job.objects.create(
+            title='Backend Engineer', company='Acme',
+            description='Python Django developer', requirements='Python and Django required.',
+            created_by=self.user
+        )
+
+    def create_resumes(self, count):
+        for i in range(count):
+            Resume.objects.create(
+                name=f'Candidate {i}', email=f'c{i}@example.com', file=f'resumes/c{i}.txt',
+                skills='Python, Django', extracted_text=f'Candidate {i} python django developer',
+                uploaded_by=self.user
+            )
+
+    def match(self, top_n=50):
+        return self.client.post(f'/api/jobs/{self.job.id}/match/', {'top_n': top_n}, format='json')
+
+
+@override_settings(JOB_MATCH_ENGINE='fuzzy')
+class JobMatchPersistenceTests(JobMatchTestCase):
+    def test_query_count_does_not_grow_with_matches(self):
+        # job lookup, corpus generation, scored columns, winners' rows, one upsert for every match
+        self.create_resumes(3)
+        with self.assertNumQueries(5):
+            self.assertEqual(self.match().status_code, 200)
+
+        self.create_resumes(30)
+        cache.clear()
+        with self.assertNumQueries(5):
+            response = self.match()
+        self.assertEqual(response.data['total_matches'], 33)
+
+    def test_rematch_updates_existing_rows(self):
+        self.create_resumes(2)
+        self.match()
+        JobMatch.objects.update(match_score=0.0, matched_skills='')
+
+        cache.clear()
+        self.match()
+        self.assertEqual(JobMatch.objects.filter(job=self.job).count(), 2)
+        for job_match in JobMatch.objects.filter(job=self.job):
+            self.assertGreater(job_match.match_score, 0.1)
+            self.assertEqual(job_match.matched_skills, 'Python, Django')
+
+
+@override_settings(JOB_MATCH_ENGINE='fuzzy')
+class JobMatchCacheTests(JobMatchTestCase):
+    def scored_counts(self):
+        return mock.patch('api.matching.rank_job_matches', wraps=rank_job_matches)
+
+    def test_unchanged_corpus_is_a_cache_hit(self):
+        self.create_resumes(3)
+        first = self.match()
+        with self.assertNumQueries(2), self.scored_counts() as scorer:
+            second = self.match()
+        scorer.assert_not_called()
+        self.assertEqual(second.data['cache_status'], 'hit')
+        self.assertEqual(second.data['matches'], first.data['matches'])
+
+    def test_only_new_resumes_are_scored(self):
+        self.create_resumes(3)
+        self.match()
+        Resume.objects.create(
+            name='Newcomer', email='new@example.com', file='resumes/new.txt',
+            skills='Python', extracted_text='Python developer', uploaded_by=self.user
+        )
+        with self.scored_counts() as scorer:
+            response = self.match()
+        self.assertEqual(response.data['cache_status'], 'incremental')
+        newcomer = Resume.objects.get(name='Newcomer')
+        self.assertEqual([row['id'] for row in scorer.call_args.args[1]], [newcomer.id])
+        self.assertEqual(response.data['total_matches'], 4)
+        self.assertEqual(JobMatch.objects.filter(job=self.job).count(), 4)
+
+    def test_job_update_and_removal_rescore_everything(self):
+        self.create_resumes(3)
+        self.match()
+        self.job.requirements = 'Django required.'
+        self.job.save()
+        self.assertEqual(self.match().data['cache_status'], 'miss')
+
+        Resume.objects.first().delete()
+        response = self.match()
+        self.assertEqual(response.data['cache_status'], 'miss')
+        self.assertEqual(response.data['total_matches'], 2)
+
+
+@override_settings(JOB_MATCH_ENGINE='tfidf')
+class TfidfEngineTests(JobMatchTestCase):
+    def engine(self):
+        return get_match_engine(*CorpusState.current())
+
+    def test_ranking_and_threshold(self):
+        both = create_resume(self.user, 'Both', 'Python, Django', 'Python and Django services')
+        python = create_resume(self.user, 'Python', 'Python', 'Python scripts')
+        create_resume(self.user, 'Unrelated', 'Excel', 'Spreadsheets and accounting')
+        matches = self.match().data['matches']
+        self.assertEqual([match['name'] for match in matches], ['Both', 'Python'])
+        self.assertTrue(all(match['match_score'] > MIN_MATCH_SCORE for match in matches))
+
+        # Cosine scores weighted 0.7 skills / 0.3 text stay within [0, 1]
+        scores = dict(self.engine().top('Python and Django required.', top_n=10))
+        self.assertGreater(scores[both.id], scores[python.id])
+        self.assertLessEqual(scores[both.id], 1.0 + 1e-6)
+        self.assertEqual(self.engine().top('Kubernetes and Terraform', top_n=10), [])
+
+    def test_new_resumes_are_appended_as_a_segment(self):
+        self.create_resumes(5)
+        self.match()
+        epoch = self.engine().epoch
+        late = create_resume(self.user, 'Late', 'Python, Django', 'Python Django developer')
+        response = self.match()
+        engine = self.engine()
+        self.assertEqual(response.data['cache_status'], 'incremental')
+        self.assertEqual((len(engine.segments), engine.epoch), (2, epoch))
+        self.assertIn(late.id, [match['resume_id'] for match in response.data['matches']])
+
+    def test_appended_resumes_match_on_terms_new_to_the_engine(self):
+        self.create_resumes(5)
+        self.match()
+        late = create_resume(self.user, 'Late', 'Haskell, Erlang', 'Haskell and Erlang services')
+        self.job.description, self.job.requirements = 'Haskell developer', 'Haskell and Erlang required.'
+        self.job.save()
+        response = self.match()
+        self.assertEqual(len(self.engine().segments), 2)
+        self.assertEqual([match['resume_id'] for match in response.data['matches']], [late.id])
+
+    def test_first_resumes_after_an_empty_build_are_matched(self):
+        self.match()
+        first = create_resume(self.user, 'First', 'Python, Django', 'Python Django developer')
+        self.assertEqual([match['resume_id'] for match in self.match().data['matches']], [first.id])
+
+    def test_delete_rebuilds_the_engine(self):
+        self.create_resumes(3)
+        self.match()
+        epoch = self.engine().epoch
+        gone = Resume.objects.first()
+        gone.delete()
+        response = self.match()
+        engine = self.engine()
+        self.assertEqual(response.data['cache_status'], 'miss')
+        self.assertEqual(len(engine.segments), 1)
+        self.assertNotEqual(engine.epoch, epoch)
+        self.assertNotIn(gone.id, engine.resume_ids)
+        self.assertEqual(response.data['total_matches'], 2)
+
+
+class UploadTestCase(TestCase):
+    """Uploads stored in a throwaway MEDIA_ROOT"""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user('uploader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content, **params):
+        url = '/api/resumes/' + (f'?{urlencode(params)}' if params else '')
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def status(self, resume_id):
+        return self.client.get(f'/api/resumes/{resume_id}/status/').data
+
+
+@override_settings(RESUME_INGESTION_ASYNC=True)
+@mock.patch('api.ingestion.close_old_connections')  # Would close the test transaction's connection
+class AsyncIngestionTests(UploadTestCase):
+    def accepted_upload(self, name='grace.txt', content=b'Grace Hopper\nPython and Django developer'):
+        # The extraction job is only submitted on commit; keep it from running
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload(name, content)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], Resume.STATUS_PROCESSING)
+        self.assertEqual(len(callbacks), 1)
+        return Resume.objects.get(id=response.data['id'])
+
+    def test_worker_result_marks_the_resume_ready(self, close_connections):
+        resume = self.accepted_upload()
+        self.assertEqual(self.status(resume.id)['status'], Resume.STATUS_PROCESSING)
+
+        future = Future()
+        future.set_result(extract_resume_data(resume.file.path))
+        _extraction_done(resume.id, future)
+        status = self.status(resume.id)
+        self.assertEqual(status['status'], Resume.STATUS_READY)
+        self.assertEqual(status['skills'], 'Python, Django')
+        self.assertTrue(ExtractionCache.objects.filter(content_hash=resume.content_hash).exists())
+
+    def test_worker_failure_is_reported(self, close_connections):
+        resume = self.accepted_upload()
+        future = Future()
+        future.set_exception(ValueError('Unsupported file format'))
+        with self.assertLogs('api.ingestion', 'ERROR'):
+            _extraction_done(resume.id, future)
+        status = self.status(resume.id)
+        self.assertEqual(status['status'], Resume.STATUS_FAILED)
+        self.assertEqual(status['processing_error'], 'Unsupported file format')
+
+    def test_pending_resumes_are_finished_by_the_command(self, close_connections):
+        resume = self.accepted_upload()
+        out = StringIO()
+        call_command('process_pending_resumes', stdout=out)
+        self.assertIn('Processed 1 pending resumes', out.getvalue())
+        self.assertEqual(self.status(resume.id)['status'], Resume.STATUS_READY)
+
+
+@override_settings(RESUME_INGESTION_ASYNC=False)
+class ExtractionCacheTests(UploadTestCase):
+    content = b'Grace Hopper\nPython and Django developer'
+
+    def test_identical_bytes_reuse_the_cached_extraction(self):
+        first = self.upload('grace.txt', self.content)
+        self.assertEqual(first.status_code, 201)
+        with mock.patch('api.ingestion.extract_resume_data') as extract:
+            second = self.upload('copy.txt', self.content)
+        extract.assert_not_called()
+        self.assertEqual(second.status_code, 201)
+        self.assertNotEqual(second.data['id'], first.data['id'])
+        self.assertEqual(second.data['status'], Resume.STATUS_READY)
+        self.assertEqual(second.data['skills'], 'Python, Django')
+
+    def test_extractor_version_bump_invalidates_the_cache(self):
+        self.upload('grace.txt', self.content)
+        ExtractionCache.objects.update(extractor_version=0)
+        with mock.patch('api.ingestion.extract_resume_data', wraps=extract_resume_data) as extract:
+            response = self.upload('copy.txt', self.content)
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(response.data['skills'], 'Python, Django')
+        self.assertEqual(ExtractionCache.objects.get().extractor_version, EXTRACTOR_VERSION)
+
+    def test_dedupe_link_returns_the_callers_own_resume(self):
+        first = self.upload('grace.txt', self.content)
+        stored = set(os.listdir(os.path.join(settings.MEDIA_ROOT, 'resumes')))
+        linked = self.upload('copy.txt', self.content, dedupe='link')
+        self.assertEqual(linked.status_code, 200)
+        self.assertEqual(linked.data['id'], first.data['id'])
+        self.assertEqual(Resume.objects.count(), 1)
+        # The duplicate upload is not kept in storage
+        self.assertEqual(set(os.listdir(os.path.join(settings.MEDIA_ROOT, 'resumes'))), stored)
+
+    def test_dedupe_link_ignores_other_users_resumes(self):
+        first = self.upload('grace.txt', self.content)
+        self.client.force_authenticate(User.objects.create_user('other'))
+        response = self.upload('copy.txt', self.content, dedupe='link')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(response.data['id'], first.data['id'])
+        self.assertEqual(Resume.objects.count(), 2)
+
+
+@override_settings(RESUME_INGESTION_ASYNC=False, RESUME_INGESTION_WORKERS=1)
+class BulkUploadTests(UploadTestCase):
+    def bulk_upload(self, files=(), archive=None, key=None):
+        data = {'files': [SimpleUploadedFile(name, content) for name, content in files]}
+        if archive is not None:
+            data['archive'] = SimpleUploadedFile('resumes.zip', archive)
+        headers = {'Idempotency-Key': key} if key else None
+        return self.client.post('/api/resumes/bulk/', data, format='multipart', headers=headers)
+
+    def results(self, response):
+        return {entry['file']: entry for entry in response.data['results']}
+
+    def test_archive_members_are_ingested(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('team/grace.txt', 'Grace Hopper\nPython developer')
+            archive.writestr('team/linus.txt', 'Linus Torvalds\nDocker and Kubernetes')
+            archive.writestr('team/.DS_Store', 'junk')
+            archive.writestr('__MACOSX/team/._grace.txt', 'junk')
+        response = self.bulk_upload(archive=buffer.getvalue())
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['created'], 2)
+        results = self.results(response)
+        self.assertEqual(set(results), {'team/grace.txt', 'team/linus.txt'})
+        resume = Resume.objects.get(id=results['team/grace.txt']['resume_id'])
+        self.assertEqual(resume.status, Resume.STATUS_READY)
+        self.assertEqual(resume.skills, 'Python')
+
+    def test_invalid_archive_is_rejected(self):
+        response = self.bulk_upload(archive=b'not a zip')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error']['code'], 'INVALID_ARCHIVE')
+
+    @override_settings(RESUME_BULK_MAX_FILE_SIZE=100)
+    def test_oversized_files_are_skipped(self):
+        response = self.bulk_upload([('small.txt', b'Python developer'), ('large.txt', b'Python ' * 100)])
+        results = self.results(response)
+        self.assertEqual(results['small.txt']['status'], 'created')
+        self.assertEqual(results['large.txt']['status'], 'failed')
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_retry_with_idempotency_key_skips_created_files(self):
+        files = [('a.txt', b'Python developer'), ('b.txt', b'Django developer')]
+        first = self.bulk_upload(files, key='import-1')
+        self.assertEqual(first.data['created'], 2)
+
+        retry = self.bulk_upload(files + [('c.txt', b'React developer')], key='import-1')
+        self.assertEqual(retry.status_code, 201)
+        results = self.results(retry)
+        self.assertEqual(results['a.txt']['status'], 'duplicate')
+        self.assertEqual(results['a.txt']['resume_id'], self.results(first)['a.txt']['resume_id'])
+        self.assertEqual(results['c.txt']['status'], 'created')
+        self.assertEqual(Resume.objects.count(), 3)
+
+    def test_identical_files_are_extracted_once(self):
+        with mock.patch('api.ingestion.extract_resume_data', wraps=extract_resume_data) as extract:
+            response = self.bulk_upload([('a.txt', b'Python developer'), ('b.txt', b'Python developer')])
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(extract.call_count, 1)
+
+        response = self.bulk_upload([('c.txt', b'Python developer')])
+        self.assertTrue(self.results(response)['c.txt']['cached'])
+
+    def test_partial_failure_reports_each_file(self):
+        def extract(path, limits):
+            if path.endswith('.pdf'):
+                raise ValueError('Corrupt PDF')
+            return extract_resume_data(path, limits)
+
+        files = [('good.txt', b'Python developer'), ('broken.pdf', b'not a pdf')]
+        with mock.patch('api.ingestion.extract_resume_data', side_effect=extract):
+            with self.assertLogs('api.ingestion', 'ERROR'):
+                response = self.bulk_upload(files, key='import-2')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        failed = self.results(response)['broken.pdf']
+        self.assertEqual(failed['error'], 'Corrupt PDF')
+        self.assertEqual(self.status(failed['resume_id'])['status'], Resume.STATUS_FAILED)
+
+        # Retrying with the same key extracts the failed file again
+        retry = self.bulk_upload(files, key='import-2')
+        results = self.results(retry)
+        self.assertEqual(results['good.txt']['status'], 'duplicate')
+        self.assertEqual(results['broken.pdf']['status'], 'created')
+        self.assertFalse(Resume.objects.filter(id=failed['resume_id']).exists())
+        self.assertEqual(Resume.objects.count(), 2)
+
+    @override_settings(RESUME_INGESTION_ASYNC=True)
+    def test_async_upload_returns_resume_ids_to_poll(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.bulk_upload([('a.txt', b'Python developer'), ('b.txt', b'Python developer')])
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['processing'], 2)
+        self.assertEqual(len(callbacks), 1)
+        for entry in response.data['results']:
+            self.assertEqual(self.status(entry['resume_id'])['status'], Resume.STATUS_PROCESSING)
+
+    @mock.patch('api.ingestion.BULK_BATCH_SIZE', 2)
+    def test_rows_are_inserted_in_batches(self):
+        with mock.patch('api.ingestion.insert_bulk_batch', wraps=insert_bulk_batch) as insert:
+            response = self.bulk_upload([(f'{i}.txt', f'Python developer {i}'.encode()) for i in range(5)])
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual([len(call.args[0]) for call in insert.call_args_list], [2, 2, 1])
+
+
+class SkillMatcherTests(TestCase):
+    def test_skill_boundaries(self):
+        matcher = get_skill_matcher()
+        self.assertEqual(matcher.find('JavaScript and TypeScript'), ['JavaScript', 'TypeScript'])
+        self.assertEqual(matcher.find('Java developer'), ['Java'])
+        self.assertEqual(matcher.find('Built REST APIs'), ['REST'])
+        self.assertEqual(matcher.find('Strong interest in rates'), [])
+        self.assertEqual(matcher.find('Node.js services'), ['Node.js'])
+
+    def test_common_words_need_a_skill_list(self):
+        matcher = get_skill_matcher()
+        for text in (
+            'Led R&D for payments', 'Plan C was approved', 'Less than two weeks', 'The Go-to person',
+            'Swift learner', 'Intern, Spring 2020', 'Ada Lovelace', 'Shell company audit',
+            'Sales team of five', 'Tax season', 'Lean startup',
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(matcher.find(text), [])
+
+        self.assertEqual(matcher.find('Languages: Python, Go, Rust'), ['Python', 'Go', 'Rust'])
+        self.assertEqual(matcher.find('C/C++ and Swift'), ['C', 'C++', 'Swift'])
+        self.assertEqual(matcher.find('Wrote golang daemons'), ['Go'])
+        self.assertEqual(matcher.canonical('Go'), 'Go')
+
+
+class ExtractionLimitTests(TestCase):
+    def test_large_text_is_truncated_and_flagged(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('Python developer. ' * 20000)
+        self.addCleanup(os.remove, f.name)
+
+        data = extract_resume_data(f.name, ExtractionLimits(max_chars=1000))
+        self.assertEqual(len(data['extracted_text']), 1000)
+        self.assertTrue(data['truncated'])
+        self.assertEqual(data['truncation_reason'], 'characters')
+        self.assertEqual(data['skills'], 'Python')
+
+        data = extract_resume_data(f.name, ExtractionLimits(max_chars=10 ** 6))
+        self.assertFalse(data['truncated'])
+
+    def test_pages_past_a_limit_are_not_parsed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'long.pdf')
+        write_pdf(path, '\n'.join(f'Line {i}' for i in range(150)))  # Three pages
+
+        with mock.patch('api.utils.read_pdf_page', wraps=read_pdf_page) as read:
+            document = extract_document(path, ExtractionLimits(max_pages=2))
+        self.assertEqual((document.pages, document.truncation_reason), (2, 'pages'))
+        self.assertEqual(read.call_count, 2)
+
+        with mock.patch('api.utils.read_pdf_page', wraps=read_pdf_page) as read, \
+                mock.patch('api.utils.time') as clock:
+            clock.monotonic.side_effect = [0.0, 0.5, 2.0]  # Start, before page 1, before page 2
+            document = extract_document(path, ExtractionLimits(time_limit=1.0))
+        self.assertEqual((document.pages, document.truncation_reason), (1, 'time'))
+        self.assertEqual(read.call_count, 1)
+
+
+class BenchmarkCorpusTests(TestCase):
+    def test_generated_files_extract_in_every_format(self):
+        resume = next(generate_resumes(1, seed=7))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        for file_format, write in WRITERS.items():
+            path = os.path.join(directory, f'resume.{file_format}')
+            write(path, resume['text'])
+            self.addCleanup(os.remove, path)
+            text = extract_text_from_file(path)
+            self.assertIn(resume['name'], text, file_format)
+            self.assertIn('EXPERIENCE', text, file_format)
+
+    def test_compare_flags_only_real_slowdowns(self):
+        baseline = {'results': [
+            {'name': 'ask', 'size': 10, 'median_ms': 100.0, 'peak_alloc_kb': 500.0},
+            {'name': 'list', 'size': 10, 'median_ms': 0.5, 'peak_alloc_kb': 10.0},
+        ]}
+        current = {'results': [
+            {'name': 'ask', 'size': 10, 'median_ms': 150.0, 'peak_alloc_kb': 510.0},
+            {'name': 'list', 'size': 10, 'median_ms': 0.9, 'peak_alloc_kb': 20.0},  # Within the noise floor
+        ]}
+        regressions = compare(baseline, current, tolerance=0.2)
+        self.assertEqual([(r['benchmark'], r['metric']) for r in regressions], [('ask[10]', 'median_ms')])
+
+
+class ExperienceYearsTests(TestCase):
+    def test_overlapping_ranges_are_merged(self):
+        text = (
+            'Backend Engineer, Acme  Jan 2015 - Dec 2018\n'
+            'Consultant, Globex  2017 - 2020\n'       # Overlaps the Acme job
+            'Lead, Initech  Mar 2021 – present\n'
+            'BSc Computer Science, State University  2011 - 2015\n'
+        )
+        self.assertEqual(extract_experience_years(text, today=date(2024, 3, 1)), 8.0)
+        self.assertEqual(extract_experience_years('12+ years of experience, 2020 - 2022'), 12.0)
+        self.assertEqual(extract_experience_years('No dates here'), 0.0)
+
+    def test_resume_list_filters_and_sorts_by_years(self):
+        cache.clear()
+        user = User.objects.create_user('owner')
+        for name, years in (('Mid', 4.5), ('Senior', 11), ('Junior', 0.5)):
+            Resume.objects.create(name=name, file=f'resumes/{name}.txt', experience_years=years, uploaded_by=user)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get('/api/resumes/', {'min_experience': 4, 'ordering': '-experience_years'})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Senior', 'Mid'])
+        response = client.get('/api/resumes/', {'min_experience': 'five'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CorpusGenerationTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.resume = Resume.objects.create(
+            name='Grace', file='resumes/grace.txt', skills='Python', extracted_text='python', uploaded_by=user
+        )
+
+    def generation(self):
+        return CorpusState.current()[0]
+
+    def test_only_corpus_changes_advance_the_generation(self):
+        generation = self.generation()
+        self.assertEqual(self.resume.generation, generation)
+
+        with self.assertNumQueries(1):
+            self.resume.phone = '555-0100'
+            self.resume.save()
+        Resume.objects.get(id=self.resume.id).save(update_fields=['processing_error'])
+        self.assertEqual(self.generation(), generation)
+
+        resume = Resume.objects.get(id=self.resume.id)
+        resume.skills = 'Python, Django'
+        resume.save(update_fields=['skills'])
+        self.assertEqual(self.generation(), generation + 1)
+        self.assertEqual(Resume.objects.get(id=self.resume.id).generation, generation + 1)
+
+    def test_deferred_fields_are_not_compared(self):
+        generation = self.generation()
+        resume = Resume.objects.only('id', 'status', 'phone').get(id=self.resume.id)
+        resume.phone = '555-0100'
+        resume.save()
+        self.assertEqual(self.generation(), generation)
+
+        resume.status = Resume.STATUS_FAILED
+        resume.save(update_fields=['status'])
+        self.assertEqual(self.generation(), generation + 1)
+
+
+class SearchDocumentTests(TestCase):
+    def test_search_document_is_refreshed_on_save(self):
+        user = User.objects.create_user('owner')
+        resume = Resume.objects.create(
+            name='Ada', file='resumes/ada.txt', skills='Python', extracted_text='Senior  ENGINEER\nat Acme',
+            uploaded_by=user
+        )
+        self.assertEqual(resume.search_document, 'acme ada at engineer python senior')
+
+        resume.skills = 'Rust'
+        resume.save(update_fields=['skills'])
+        resume.refresh_from_db()
+        self.assertEqual(resume.search_document, 'acme ada at engineer rust senior')
+
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/ask/', {'query': 'rust engineer'}, format='json')
+        self.assertEqual(response.data['results'][0]['resume_id'], resume.id)
+
+    def test_ask_keeps_top_k_and_counts_all_matches(self):
+        user = User.objects.create_user('owner')
+        for i in range(5):
+            Resume.objects.create(
+                name=f'Dev {i}', file=f'resumes/{i}.txt', skills='Python',
+                extracted_text='python engineer ' * (i + 1), uploaded_by=user
+            )
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/ask/', {'query': 'python engineer', 'k': 2}, format='json')
+        self.assertEqual(response.data['total_results'], 5)
+        self.assertEqual([row['name'] for row in response.data['results']], ['Dev 0', 'Dev 1'])
+        self.assertTrue(response.data['results'][0]['evidence_snippets'])
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+
+    def test_postings_follow_saves_and_deletes(self):
+        resume = create_resume(self.user, 'Ada', 'Python', 'Python and Django at Acme')
+        self.assertEqual(
+            dict(ResumeTerm.objects.filter(resume=resume).values_list('term', 'frequency')),
+            {'ada': 1, 'python': 2, 'django': 1, 'acme': 1}
+        )
+        resume.extracted_text = 'Rust at Initech'
+        resume.save()
+        self.assertEqual(
+            set(ResumeTerm.objects.filter(resume=resume).values_list('term', flat=True)),
+            {'ada', 'python', 'rust', 'initech'}
+        )
+        resume.delete()
+        self.assertFalse(ResumeTerm.objects.exists())
+
+    def test_candidates_are_every_resume_sharing_a_term(self):
+        texts = {
+            'Both': 'python django developer', 'Python': 'python scripts', 'Django': 'django templates',
+            'Neither': 'java spring developer', 'Prefix': 'pythonic code',
+        }
+        for name, text in texts.items():
+            create_resume(self.user, name, '', text)
+        query = 'find a python django engineer'
+        expected = {name for name, text in texts.items() if set(tokenize(text)) & set(tokenize(query))}
+        names = list(candidate_resumes(query).values_list('name', flat=True))
+        self.assertEqual(set(names), expected)
+        self.assertEqual(names[0], 'Both')  # Most distinct query terms first
+        self.assertFalse(candidate_resumes('the and of').exists())
+
+
+class ScoringBudgetTests(JobMatchTestCase):
+    def deadline(self, *checks):
+        """Patch the answers of successive deadline checks; the deadline has passed after them"""
+        return mock.patch.object(ScoringProgress, 'expired', side_effect=[*checks] + [True] * 100)
+
+    def test_ask_fetch_and_scoring_stop_at_the_deadline(self):
+        self.create_resumes(5)
+        with mock.patch('api.utils.BUDGET_PAGE_SIZE', 2), self.deadline(False, False, True, False):
+            # Two of three pages fetched, then one resume scored before the deadline
+            response = self.client.post('/api/ask/', {'query': 'python', 'budget_ms': 50}, format='json')
+        self.assertTrue(response.data['partial'])
+        self.assertEqual(response.data['scored_fraction'], 0.2)
+        self.assertEqual(len(response.data['results']), 1)
+
+        response = self.client.post('/api/ask/', {'query': 'python', 'budget_ms': 60000}, format='json')
+        self.assertFalse(response.data['partial'])
+        self.assertEqual(response.data['scored_fraction'], 1.0)
+        self.assertEqual(len(response.data['results']), 5)
+
+    @override_settings(JOB_MATCH_ENGINE='fuzzy')
+    def test_partial_match_is_not_cached(self):
+        self.create_resumes(4)
+        with mock.patch('api.utils.BUDGET_PAGE_SIZE', 2), self.deadline(False):
+            response = self.client.post(f'/api/jobs/{self.job.id}/match/', {'budget_ms': 50}, format='json')
+        self.assertTrue(response.data['partial'])
+        self.assertEqual(response.data['scored_fraction'], 0.0)
+        self.assertEqual(self.match().data['cache_status'], 'miss')
+
+    @override_settings(JOB_MATCH_ENGINE='tfidf')
+    def test_tfidf_engine_ignores_the_budget(self):
+        self.create_resumes(3)
+        with self.deadline():
+            response = self.client.post(f'/api/jobs/{self.job.id}/match/', {'top_n': 50, 'budget_ms': 1}, format='json')
+        self.assertFalse(response.data['partial'])
+        self.assertEqual(response.data['scored_fraction'], 1.0)
+        self.assertEqual(response.data['total_matches'], 3)
+        self.assertEqual(self.match().data['cache_status'], 'hit')
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('owner')
+        Resume.objects.create(
+            name='Ada', file='resumes/ada.txt', skills='Python', extracted_text='python engineer', uploaded_by=user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def ask(self):
+        return self.client.post('/api/ask/', {'query': 'python engineer'}, format='json')
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_stages_are_reported_in_header_and_log(self):
+        with self.assertLogs('api.timing', 'INFO') as logs:
+            response = self.ask()
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, ['candidates', 'score', 'rows', 'snippets', 'render', 'db', 'total'])
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/api/ask/')
+        self.assertEqual(record['corpus_size'], 1)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertIn('score', record['stages_ms'])
+
+    def test_disabled_by_default(self):
+        self.assertFalse(self.ask().has_header('Server-Timing'))
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('owner')
+        for i in range(7):
+            Resume.objects.create(name=f'Dev {i}', file=f'resumes/{i}.txt', uploaded_by=user)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_cursor_pages_match_offset_order(self):
+        expected = [row['id'] for row in self.client.get('/api/resumes/', {'limit': 10}).data['results']]
+
+        response = self.client.get('/api/resumes/', {'pagination': 'cursor', 'limit': 3})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        seen, pages = [], []
+        while True:
+            pages.append(response.data)
+            seen += [row['id'] for row in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+
+        previous = self.client.get(pages[2]['previous']).data
+        self.assertEqual(previous['results'], pages[1]['results'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/resumes/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error']['code'], 'INVALID_CURSOR')
+
+
+class SkillFilterTests(TestCase):
+    def test_skill_filter_requires_every_skill(self):
+        cache.clear()
+        user = User.objects.create_user('owner')
+        both = Resume.objects.create(name='Both', file='resumes/a.txt', skills='Python, Kubernetes', uploaded_by=user)
+        Resume.objects.create(name='Python', file='resumes/b.txt', skills='Python', uploaded_by=user)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        def names(*skills):
+            response = client.get('/api/resumes/', {'skill': list(skills)})
+            return sorted(row['name'] for row in response.data['results'])
+
+        self.assertEqual(names('python'), ['Both', 'Python'])
+        self.assertEqual(names('Python', 'k8s'), ['Both'])  # Aliases resolve to the taxonomy name
+        self.assertEqual(names('rust'), [])
+
+        both.skills = 'Rust'
+        both.save(update_fields=['skills'])
+        self.assertEqual(names('rust'), ['Both'])
+        self.assertEqual(names('python', 'kubernetes'), [])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner')
+        self.resume = Resume.objects.create(
+            name='Ada', file='resumes/ada.txt', skills='Python', extracted_text='python ' * 1000, uploaded_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_detail_loads_only_requested_fields_in_one_query(self):
+        url = f'/api/resumes/{self.resume.id}/'
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'fields': 'id,name,uploaded_by'})
+        self.assertEqual(set(response.data), {'id', 'name', 'uploaded_by'})
+        self.assertEqual(response.data['uploaded_by']['username'], 'owner')
+
+        response = self.client.get(url, {'exclude': 'extracted_text'})
+        self.assertNotIn('extracted_text', response.data)
+        self.assertIn('skills', response.data)
+
+        response = self.client.patch(f'{url}?fields=name', {'name': 'Bea'}, format='json')
+        self.assertEqual(response.data, {'name': 'Bea'})
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.extracted_text, 'python ' * 1000)
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/jobs/', {'fields': 'title,salary'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error']['field'], 'fields')
+
+
+class BitmapFilterTests(JobMatchTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_bitmap_index()  # Generations restart with every test's rolled back database
+        self.senior = Resume.objects.create(
+            name='Senior', file='resumes/s.txt', skills='Python, Django', experience_years=8.5,
+            extracted_text='python django developer', uploaded_by=self.user
+        )
+        self.junior = Resume.objects.create(
+            name='Junior', file='resumes/j.txt', skills='Python, Flask', experience_years=1,
+            extracted_text='python flask developer', uploaded_by=self.user
+        )
+
+    def candidates(self, expression):
+        return get_bitmap_index().candidates(expression)
+
+    def test_boolean_expressions(self):
+        self.assertEqual(self.candidates('python'), {self.senior.id, self.junior.id})
+        self.assertEqual(self.candidates('python AND NOT flask'), {self.senior.id})
+        self.assertEqual(self.candidates('(django OR flask) years>=5'), {self.senior.id})
+        self.assertEqual(self.candidates('rust'), set())
+        with self.assertRaises(FilterSyntaxError):
+            parse_filter('python AND (django')
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.candidates('flask'), {self.junior.id})
+        self.junior.skills = 'Rust'
+        self.junior.save()
+        self.assertEqual(self.candidates('flask'), set())
+        self.assertEqual(self.candidates('rust'), {self.junior.id})
+        self.senior.delete()
+        self.assertEqual(self.candidates('python OR rust'), {self.junior.id})
+
+    def test_resaves_reuse_the_resume_position(self):
+        self.candidates('python')
+        for skills in ('Rust', 'Go', 'Python, Flask'):
+            self.junior.skills = skills
+            self.junior.save()
+            self.candidates('python')
+        self.junior.status = Resume.STATUS_FAILED
+        self.junior.save()
+        self.assertEqual(self.candidates('python OR rust OR go'), {self.senior.id})
+        self.junior.status = Resume.STATUS_READY
+        self.junior.save()
+        self.assertEqual(self.candidates('flask years>=1'), {self.junior.id})
+        self.assertEqual(self.candidates('rust OR go'), set())
+        self.assertEqual(len(get_bitmap_index().resume_ids), 2)
+
+    def test_filtered_ask_and_match_score_only_survivors(self):
+        response = self.client.post('/api/ask/', {'query': 'python developer', 'filter': 'years>=5'}, format='json')
+        self.assertEqual([row['name'] for row in response.data['results']], ['Senior'])
+
+        response = self.match()
+        self.assertEqual(response.data['total_matches'], 2)
+        response = self.client.post(f'/api/jobs/{self.job.id}/match/', {'filter': 'NOT django'}, format='json')
+        self.assertEqual([match['name'] for match in response.data['matches']], ['Junior'])
+
+        response = self.client.post('/api/ask/', {'query': 'python', 'filter': 'python OR'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_filtered_rows_are_loaded(self):
+        with mock.patch('api.search_index.rank_resumes', wraps=rank_resumes) as ranker:
+            self.client.post('/api/ask/', {'query': 'python developer', 'filter': 'flask'}, format='json')
+        self.assertEqual([row['id'] for row in ranker.call_args.args[1]], [self.junior.id])
+
+        with override_settings(JOB_MATCH_ENGINE='fuzzy'), \
+                mock.patch('api.matching.rank_job_matches', wraps=rank_job_matches) as ranker:
+            self.client.post(f'/api/jobs/{self.job.id}/match/', {'filter': 'django'}, format='json')
+        self.assertEqual([row['id'] for row in ranker.call_args.args[1]], [self.senior.id])
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('searcher')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, query):
+        response = self.client.get('/api/resumes/', {'q': query})
+        return [row['name'] for row in response.data['results']]
+
+    def test_search_is_ranked_and_follows_edits_and_deletes(self):
+        ada = create_resume(self.user, 'Ada', 'Python, Django', 'Python developer, python everywhere')
+        bob = create_resume(self.user, 'Bob', 'Java', 'Wrote one python script')
+        self.assertEqual(self.search('pyth'), ['Ada', 'Bob'])
+        self.assertEqual(self.search('java python'), ['Bob'])
+        self.assertEqual(self.search('bob@example.com'), ['Bob'])
+
+        ada.skills = 'Rust'
+        ada.save()
+        self.assertEqual(self.search('rust'), ['Ada'])
+        bob.delete()
+        self.assertEqual(self.search('python'), ['Ada'])
+
+    def test_text_is_stored_compressed(self):
+        text = 'Python developer shipping Django services. ' * 50
+        ada = create_resume(self.user, 'Ada', 'Python', text)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT extracted_text, search_document FROM api_resume WHERE id = %s', [ada.id.hex])
+            stored, document = cursor.fetchone()
+        self.assertEqual(bytes(stored)[:1], b'z')
+        self.assertLess(len(bytes(stored)), len(text) // 10)
+        # /ask scans the search document on every query, so it stays plain
+        self.assertEqual(document, ada.search_document)
+        self.assertEqual(Resume.objects.values_list('extracted_text', flat=True).get(), text)
+        self.assertEqual(decompress_text('legacy plain text'), 'legacy plain text')
+
+        # The unindexed fallback matches the text through the term index, by prefix
+        with mock.patch('api.views.get_fulltext_backend', return_value=LikeBackend()):
+            self.assertEqual(self.search('shipp djang'), ['Ada'])
+            self.assertEqual(self.search('shipping rust'), [])
+
+
+class SnippetTests(TestCase):
+    def test_passages_cover_every_occurrence_with_offsets(self):
+        text = 'Intro. ' * 30 + 'Shipped Python and Django services. ' + 'Filler. ' * 40 + 'More PYTHON here.'
+        hits = TermHighlighter(['python', 'django']).hits(text)
+        self.assertEqual(len(hits), 3)
+
+        passages = best_passages(text, hits)
+        self.assertEqual(len(passages), 2)
+        best, second = passages
+        self.assertEqual(best.score[0], 2)
+        self.assertEqual(
+            [text[best.start + start:best.start + end] for start, end in best.highlights], ['Python', 'Django']
+        )
+        self.assertEqual(text[second.start + second.highlights[0][0]:][:6], 'PYTHON')
+
+
+@override_settings(RATE_LIMIT_TOKENS=6, RATE_LIMIT_WINDOW=60)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Stay inside one window so the previous window's count cannot leak in
+        clock = mock.patch('api.middleware.time.time', return_value=6000030.0)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_expensive_endpoints_cost_more_tokens(self):
+        response = self.client.post('/api/ask/', {'query': 'python'}, content_type='application/json')
+        self.assertEqual(response['X-RateLimit-Cost'], '5')
+        self.assertEqual(response['X-RateLimit-Remaining'], '1')
+
+        response = self.client.post('/api/ask/', {'query': 'python'}, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['error']['code'], 'RATE_LIMIT')
+        self.assertIn('Retry-After', response)
+
+        # The rejected request did not use up the remaining token
+        response = self.client.get('/api/jobs/')
+        self.assertNotEqual(response.status_code, 429)
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+        self.assertEqual(self.client.get('/api/jobs/').status_code, 429)
+
+    def test_refund_tolerates_an_expired_counter(self):
+        self.client.post('/api/ask/', {'query': 'python'}, content_type='application/json')
+        with mock.patch('api.middleware.cache.decr', side_effect=ValueError('expired')) as decr:
+            response = self.client.post('/api/ask/', {'query': 'python'}, content_type='application/json')
+        decr.assert_called_once()
+        self.assertEqual(response.status_code, 429)
+
+
+@override_settings(JOB_MATCH_ENGINE='fuzzy')
+class AsyncEndpointTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('async-user')
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+        self.job = Job.objects.create(
+            title='Backend Engineer', company='Acme', description='Python Django developer',
+            requirements='Python and Django required.', created_by=self.user
+        )
+        Resume.objects.create(
+            name='Ada', email='ada@example.com', file='resumes/ada.txt', skills='Python, Django',
+            extracted_text='Ada python django developer', uploaded_by=self.user
+        )
+
+    def post(self, path, data):
+        return self.client.post(path, data, content_type='application/json', **self.auth)
+
+    def test_async_endpoints_match_sync_results(self):
+        response = self.post('/api/ask/async/', {'query': 'python developer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['name'], 'Ada')
+
+        response = self.post(f'/api/jobs/{self.job.id}/match/async/', {'top_n': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_matches'], 1)
+        self.assertEqual(JobMatch.objects.filter(job=self.job).count(), 1)
+
+    def test_requires_token_and_rejects_when_saturated(self):
+        response = self.client.post('/api/ask/async/', {'query': 'python'}, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+        with mock.patch('api.async_views.get_scoring_pool', return_value=ScoringPool(1, 0)) as pool:
+            pool.return_value.pending = 1
+            response = self.post(f'/api/jobs/{self.job.id}/match/async/', {'top_n': 5})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()['error']['code'], 'SCORING_BUSY')
+
+            # Refused before the candidates are loaded
+            with mock.patch('api.async_views.fetch_within_budget') as fetch:
+                response = self.post('/api/ask/async/', {'query': 'python'})
+            self.assertEqual(response.status_code, 503)
+            fetch.assert_not_called()
+        self.assertEqual(pool.return_value.pending, 1)
+
+    @override_settings(JOB_MATCH_ENGINE='fuzzy')
+    def test_match_reads_outside_the_scoring_pool(self):
+        pool = ScoringPool(1, 0)
+        submitted = []
+        submit = pool.submit
+
+        async def record(func, *args):
+            submitted.append(func.__name__)
+            return await submit(func, *args)
+
+        with mock.patch('api.async_views.get_scoring_pool', return_value=pool), \
+                mock.patch.object(pool, 'submit', side_effect=record):
+            response = self.post(f'/api/jobs/{self.job.id}/match/async/', {'top_n': 5})
+        self.assertEqual(response.json()['total_matches'], 1)
+        self.assertEqual(submitted, ['rank_job_matches', 'build_matches'])
+        self.assertEqual(pool.pending, 0)
+
+    def test_missing_job_returns_the_sync_404_body(self):
+        missing = '00000000-0000-0000-0000-000000000000'
+        sync = self.post(f'/api/jobs/{missing}/match/', {'top_n': 5})
+        response = self.post(f'/api/jobs/{missing}/match/async/', {'top_n': 5})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), sync.json())
+
+    @override_settings(REQUEST_TIMING=True)
+    async def test_server_timing_covers_the_scoring_pool(self):
+        response = await self.async_client.post(
+            f'/api/jobs/{self.job.id}/match/async/', {'top_n': 5}, content_type='application/json',
+            headers={'Authorization': f'Bearer {self.token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        metrics = dict(metric.split(';', 1) for metric in response['Server-Timing'].split(', '))
+        # Spans recorded by match_job in a scoring pool thread
+        self.assertIn('fetch', metrics)
+        self.assertIn('score', metrics)
+        # Queries of the pool thread and the ORM's sync_to_async threads are counted
+        queries = int(metrics['db'].split('desc="')[1].split(' ')[0])
+        self.assertGreaterEqual(queries, 5)
+
+
+class ShardedMatchingTests(JobMatchTestCase):
+    def tearDown(self):
+        reset_sharded_scorer()
+
+    def test_sharded_results_equal_serial_results(self):
+        self.create_resumes(7)
+        Resume.objects.create(
+            name='Late', email='late@example.com', file='resumes/late.txt', skills='Django',
+            extracted_text='django developer', uploaded_by=self.user
+        )
+        with override_settings(JOB_MATCH_ENGINE='fuzzy'):
+            serial = self.match(top_n=5).data['matches']
+        cache.clear()
+        with override_settings(JOB_MATCH_ENGINE='sharded', JOB_MATCH_SHARDS=3):
+            sharded = self.match(top_n=5).data['matches']
+            self.create_resumes(2)
+            cache.clear()
+            grown = self.match(top_n=50).data['matches']
+        self.assertEqual(sharded, serial)
+        self.assertEqual(len(grown), 10)
+        self.assertEqual(len(get_sharded_scorer().order), 10)
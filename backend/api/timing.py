@@ -0,0 +1,100 @@
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from django.db import DEFAULT_DB_ALIAS
+
+_current: ContextVar[Optional['RequestTimer']] = ContextVar('request_timer', default=None)
+_NO_SPAN = nullcontext()
+
+class RequestTimer:
+    """Stage durations, database queries and extra fields collected for one request"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}  # Seconds per stage, in the order first seen
+        self.fields: Dict = {}
+        self.queries = 0
+        self.db_time = 0.0
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        # Called by count_query for every query made in this request's context
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    def server_timing(self, total: float) -> str:
+        metrics = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.stages.items()]
+        metrics.append(f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def record(self, total: float) -> Dict:
+        return {
+            'total_ms': round(total * 1000, 2),
+            'stages_ms': {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            'db_queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            **self.fields,
+        }
+
+class Span:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer: RequestTimer, name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+
+@contextmanager
+def timed_request() -> Iterator[RequestTimer]:
+    """Collect spans and count queries on the default database until the block ends"""
+    timer = RequestTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+def count_query(execute, sql, params, many, context):
+    # Installed on every default-database connection, so queries run from
+    # sync_to_async threads or the scoring pool count towards the request
+    # whose context they carry
+    timer = _current.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver adding count_query to default-database connections"""
+    if connection.alias == DEFAULT_DB_ALIAS and count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current.get()
+
+def span(name: str):
+    """Time a block as stage ``name`` of the current request; a no-op when timing is off.
+
+    Repeated stages add up, so a span inside a loop reports the total.
+    """
+    timer = _current.get()
+    return _NO_SPAN if timer is None else Span(timer, name)
+
+def annotate(**fields):
+    """Attach fields such as the corpus size to the current request's timing log line"""
+    timer = _current.get()
+    if timer is not None:
+        timer.fields.update(fields)
@@ -0,0 +1,22 @@
+import re
+from typing import List
+
+TOKEN_PATTERN = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+
+# Terms too common to narrow down the candidate set
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'of', 'on', 'or', 'that', 'the', 'to', 'was',
+    'were', 'who', 'will', 'with', 'find', 'show', 'me', 'any', 'someone',
+    'candidate', 'candidates', 'resume', 'resumes',
+])
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms"""
+    if not text:
+        return []
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and len(token) <= MAX_TERM_LENGTH and token not in STOP_WORDS
+    ]
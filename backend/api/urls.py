@@ -3,10 +3,11 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     register, login,
-    ResumeListCreateView, ResumeDetailView,
+    ResumeListCreateView, ResumeDetailView, ResumeStatusView, ResumeBulkUploadView,
     JobListCreateView, JobDetailView,
     ask_query, match_job_with_candidates
 )
+from .async_views import ask_query_async, match_job_async
 
 urlpatterns = [
     # Authentication
@@ -16,13 +17,17 @@ urlpatterns = [
     
     # Resumes
     path('resumes/', ResumeListCreateView.as_view(), name='resume-list-create'),
+    path('resumes/bulk/', ResumeBulkUploadView.as_view(), name='resume-bulk-upload'),
     path('resumes/<uuid:id>/', ResumeDetailView.as_view(), name='resume-detail'),
+    path('resumes/<uuid:id>/status/', ResumeStatusView.as_view(), name='resume-status'),
     
     # Jobs
     path('jobs/', JobListCreateView.as_view(), name='job-list-create'),
     path('jobs/<uuid:id>/', JobDetailView.as_view(), name='job-detail'),
     path('jobs/<uuid:job_id>/match/', match_job_with_candidates, name='job-match'),
+    path('jobs/<uuid:job_id>/match/async/', match_job_async, name='job-match-async'),
     
     # Query
     path('ask/', ask_query, name='ask-query'),
+    path('ask/async/', ask_query_async, name='ask-query-async'),
 ]
\ No newline at end of file
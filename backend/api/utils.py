@@ -1,91 +1,259 @@
+import heapq
 import os
 import re
-from typing import List, Tuple, Dict
+import time
+from datetime import date
+from functools import partial
+from typing import Callable, Container, Iterator, List, NamedTuple, Tuple, Dict, Optional, Set
 import pdfplumber
 from docx import Document
 from rapidfuzz import fuzz, process
 import json
 
-def extract_text_from_file(file_path: str) -> str:
-    """Extract text from PDF or DOCX file"""
-    text = ""
+from .skills import get_skill_matcher
+from .snippets import TermHighlighter, best_passages, format_passage, passage_evidence
+from .tokens import tokenize
+
+# Bump when extraction output changes so cached results are not reused
+EXTRACTOR_VERSION = 3
+
+TEXT_CHUNK_SIZE = 64 * 1024
+
+class ExtractionLimits(NamedTuple):
+    """Bounds on the work spent extracting a single document (None disables a limit)"""
+    max_pages: Optional[int] = None
+    max_chars: Optional[int] = None
+    time_limit: Optional[float] = None  # seconds
+
+class ExtractedDocument(NamedTuple):
+    text: str
+    pages: int  # PDF pages read; 0 for other formats
+    truncated: bool
+    truncation_reason: str  # '', 'pages', 'characters' or 'time'
+
+def read_pdf_page(page) -> str:
+    try:
+        return page.extract_text() or ''
+    finally:
+        # Drop the parsed layout objects so memory stays flat across pages
+        page.close()
+
+def iter_document_pieces(file_path: str) -> Iterator[Callable[[], str]]:
+    """Yield a reader per piece of a document: PDF page, DOCX paragraph or plain text chunk.
+
+    A PDF page is only parsed when its reader is called, so callers can
+    stop at a limit without paying for the page after it.
+    """
     file_extension = os.path.splitext(file_path)[1].lower()
-    
+    if file_extension == '.pdf':
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages:
+                yield partial(read_pdf_page, page)
+    elif file_extension == '.docx':
+        for paragraph in Document(file_path).paragraphs:
+            yield partial(getattr, paragraph, 'text')
+    else:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            while True:
+                chunk = f.read(TEXT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield partial(str, chunk)
+
+def extract_document(file_path: str, limits: Optional[ExtractionLimits] = None) -> ExtractedDocument:
+    """Extract text from a PDF, DOCX or text file, stopping at the configured limits.
+
+    Pieces are collected in a list and joined once. The page and time limits
+    are checked before each piece is read, so a single pathological PDF page
+    can still overrun the time limit but no page is parsed only to be dropped.
+    """
+    limits = limits or ExtractionLimits()
+    deadline = time.monotonic() + limits.time_limit if limits.time_limit else None
+    file_extension = os.path.splitext(file_path)[1].lower()
+    is_pdf = file_extension == '.pdf'
+    separator = '\n' if file_extension in ('.pdf', '.docx') else ''
+
+    parts: List[str] = []
+    pages = 0
+    chars = 0
+    reason = ''
     try:
-        if file_extension == '.pdf':
-            try:
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-            except Exception as e:
-                print(f"PDF extraction failed: {e}")
-                text = f"PDF file uploaded: {os.path.basename(file_path)}\nText extraction failed: {str(e)}"
-                
-        elif file_extension == '.docx':
-            try:
-                doc = Document(file_path)
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
-            except Exception as e:
-                print(f"DOCX extraction failed: {e}")
-                text = f"DOCX file uploaded: {os.path.basename(file_path)}\nText extraction failed: {str(e)}"
-        else:
-            # Try reading as plain text
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text = f.read()
-            except Exception as e:
-                text = f"File uploaded: {os.path.basename(file_path)}\nUnsupported format or extraction failed: {str(e)}"
-                
+        for read_piece in iter_document_pieces(file_path):
+            if is_pdf and limits.max_pages is not None and pages >= limits.max_pages:
+                reason = 'pages'
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                reason = 'time'
+                break
+            piece = read_piece()
+            pages += is_pdf
+            if limits.max_chars is not None and chars + len(piece) > limits.max_chars:
+                parts.append(piece[:max(limits.max_chars - chars, 0)])
+                reason = 'characters'
+                break
+            parts.append(piece)
+            chars += len(piece) + len(separator)
     except Exception as e:
         print(f"Error extracting text from {file_path}: {e}")
-        text = f"File uploaded: {os.path.basename(file_path)}\nExtraction error: {str(e)}"
-    
+        kind = {'.pdf': 'PDF file', '.docx': 'DOCX file'}.get(file_extension, 'File')
+        text = f"{kind} uploaded: {os.path.basename(file_path)}\nText extraction failed: {str(e)}"
+        return ExtractedDocument(text, pages, False, '')
+
+    text = separator.join(parts).strip()
     # Ensure we always return something
-    if not text.strip():
+    if not text:
         text = f"File uploaded: {os.path.basename(file_path)}\nNo text could be extracted."
-    
-    return text.strip()
+    return ExtractedDocument(text, pages, bool(reason), reason)
+
+def extract_text_from_file(file_path: str, limits: Optional[ExtractionLimits] = None) -> str:
+    """Extract text from PDF or DOCX file"""
+    return extract_document(file_path, limits).text
 
 def extract_skills_from_text(text: str) -> List[str]:
-    """Extract potential skills from resume text using keyword matching"""
-    # Common technical skills - expand this list as needed
-    skill_keywords = [
-        'python', 'java', 'javascript', 'react', 'django', 'flask', 'node.js',
-        'html', 'css', 'sql', 'postgresql', 'mongodb', 'mysql', 'git',
-        'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'linux', 'bash',
-        'machine learning', 'deep learning', 'tensorflow', 'pytorch',
-        'pandas', 'numpy', 'scikit-learn', 'opencv', 'nlp', 'api',
-        'rest', 'graphql', 'microservices', 'agile', 'scrum', 'devops',
-        'ci/cd', 'jenkins', 'selenium', 'pytest', 'junit', 'spring'
-    ]
-    
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in skill_keywords:
-        if skill in text_lower:
-            found_skills.append(skill.title())
-    
-    return list(set(found_skills))
+    """Extract skills from resume text using the skill taxonomy matcher"""
+    return get_skill_matcher().find(text)
+
+# Experience summary patterns, applied to the lowercased text
+EXPERIENCE_PATTERNS = [
+    re.compile(r'(\d+[\+]?)\s*years?\s*(?:of\s*)?(?:experience|exp)'),
+    re.compile(r'experience[:]\s*(\d+[\+]?)\s*years?'),
+    re.compile(r'(\d{4})\s*[-–—]\s*(\d{4}|present|current)'),
+]
+STATED_YEARS_PATTERNS = EXPERIENCE_PATTERNS[:2]
+
+MONTHS = {month: number for number, month in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1
+)}
+_MONTH = r'(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+)?'
+# "2018 - 2020", "Mar 2018 – present", "jan. 2019 to now"
+DATE_RANGE_PATTERN = re.compile(
+    _MONTH + r'((?:19|20)\d{2})\s*(?:[-–—]|to)\s*' + _MONTH + r'((?:19|20)\d{2}|present|current|now|today)\b'
+)
+# Date ranges on these lines are studies, not employment
+EDUCATION_LINE_PATTERN = re.compile(
+    r'\b(?:university|college|school|institute|academy|bachelor|master|degree|diploma|b\.?sc|m\.?sc|'
+    r'b\.?eng|m\.?eng|b\.?tech|m\.?tech|ph\.?d|mba|education)\b'
+)
+MAX_EXPERIENCE_YEARS = 60
 
 def extract_experience_info(text: str) -> str:
     """Extract experience information from resume text"""
-    experience_patterns = [
-        r'(\d+[\+]?)\s*years?\s*(?:of\s*)?(?:experience|exp)',
-        r'experience[:]\s*(\d+[\+]?)\s*years?',
-        r'(\d{4})\s*[-–—]\s*(\d{4}|present|current)',
-    ]
-    
+    text = text.lower()
     experiences = []
-    for pattern in experience_patterns:
-        matches = re.findall(pattern, text.lower())
+    for pattern in EXPERIENCE_PATTERNS:
+        matches = pattern.findall(text)
         experiences.extend([str(match) for match in matches if match])
     
     return ' | '.join(experiences[:3]) if experiences else ''
 
+def employment_intervals(text: str, today: Optional[date] = None) -> List[Tuple[int, int]]:
+    """(start, end) month numbers of the employment date ranges in lowercased text"""
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+    intervals = []
+    for match in DATE_RANGE_PATTERN.finditer(text):
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.end())
+        if EDUCATION_LINE_PATTERN.search(text, line_start, line_end if line_end != -1 else len(text)):
+            continue
+        start_month, start_year, end_month, end_year = match.groups()
+        start = int(start_year) * 12 + MONTHS.get(start_month, 1) - 1
+        end = now if not end_year.isdigit() else int(end_year) * 12 + MONTHS.get(end_month, 1) - 1
+        if start <= end <= now:
+            intervals.append((start, end))
+    return intervals
+
+def extract_experience_years(text: str, today: Optional[date] = None) -> float:
+    """Total years of experience: employment ranges merged where they overlap, or the
+    largest "N years of experience" statement if that is more, to one decimal place
+    """
+    text = text.lower()
+    months = 0
+    current_start = current_end = None
+    for start, end in sorted(employment_intervals(text, today)):
+        if current_end is not None and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if current_end is not None:
+            months += current_end - current_start
+        current_start, current_end = start, end
+    if current_end is not None:
+        months += current_end - current_start
+
+    stated = [
+        int(match.rstrip('+')) for pattern in STATED_YEARS_PATTERNS for match in pattern.findall(text)
+    ]
+    years = max([months / 12, *stated])
+    return round(float(min(years, MAX_EXPERIENCE_YEARS)), 1)
+
+def extract_resume_data(file_path: str, limits: Optional[ExtractionLimits] = None) -> Dict:
+    """Run the full extraction pipeline on a stored file.
+
+    Kept free of Django imports so it can run inside a process pool worker.
+    Returns the values to store on the Resume row.
+    """
+    document = extract_document(file_path, limits)
+    skills = extract_skills_from_text(document.text)
+    return {
+        'extracted_text': document.text,
+        'skills': ', '.join(skills) if skills else '',
+        'experience': extract_experience_info(document.text),
+        'experience_years': extract_experience_years(document.text),
+        'page_count': document.pages,
+        'truncated': document.truncated,
+        'truncation_reason': document.truncation_reason,
+    }
+
+class ScoringProgress:
+    """Tracks how much of the corpus a scoring pass covered within an optional time budget"""
+
+    def __init__(self, budget_ms: Optional[int] = None):
+        self.deadline = time.monotonic() + budget_ms / 1000.0 if budget_ms else None
+        self.total = 0
+        self.scored = 0
+        self.matched = 0  # Results above the threshold, for scorers that only keep the top k
+        self.unfetched = 0  # Rows never loaded because the deadline passed while fetching
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def partial(self) -> bool:
+        return self.scored < self.total
+
+    @property
+    def fraction_scored(self) -> float:
+        return self.scored / self.total if self.total else 1.0
+
+# Rows loaded per query when a budgeted request fetches its corpus
+BUDGET_PAGE_SIZE = 2000
+
+def fetch_within_budget(queryset, fields: Tuple[str, ...], progress: Optional[ScoringProgress] = None,
+                        candidates: Optional[Container] = None) -> List[Dict]:
+    """``fields`` of the rows of an ordered queryset (and in ``candidates``, if given), in its order.
+
+    Without a deadline or candidates this is a single query. Otherwise the
+    ids are read first, intersected with the candidates, and only those rows
+    loaded, a page at a time until any deadline passes, so the fetch is
+    bounded by the filter and the budget as well as the scoring; rows left
+    out by the deadline are counted in ``progress.unfetched``.
+    """
+    budgeted = progress is not None and progress.deadline is not None
+    if candidates is None and not budgeted:
+        return list(queryset.values(*fields))
+    ids = list(queryset.values_list('id', flat=True))
+    if candidates is not None:
+        ids = [row_id for row_id in ids if row_id in candidates]
+    rows = []
+    for start in range(0, len(ids), BUDGET_PAGE_SIZE):
+        if budgeted and progress.expired():
+            progress.unfetched = len(ids) - start
+            break
+        page = ids[start:start + BUDGET_PAGE_SIZE]
+        by_id = {row['id']: row for row in queryset.model.objects.filter(id__in=page).values(*fields)}
+        rows.extend(by_id[row_id] for row_id in page if row_id in by_id)
+    return rows
+
 def calculate_text_similarity(text1: str, text2: str) -> float:
     """Calculate similarity between two texts using fuzzy matching"""
     if not text1 or not text2:
@@ -95,54 +263,161 @@ def calculate_text_similarity(text1: str, text2: str) -> float:
     similarity = fuzz.token_sort_ratio(text1.lower(), text2.lower())
     return similarity / 100.0
 
-def find_matching_resumes(query: str, resume_data: List[Dict]) -> List[Dict]:
-    """Find resumes matching a query using fuzzy search"""
-    results = []
+def normalize_search_text(text: str) -> str:
+    """Lowercased, whitespace-collapsed, token-sorted text, the form token_sort_ratio compares"""
+    return ' '.join(sorted(text.lower().split()))
+
+def build_search_document(name: str, skills: str, extracted_text: str) -> str:
+    """Normalized searchable text of a resume, stored on the row at save time"""
+    return normalize_search_text(f"{name} {skills} {extracted_text}")
+
+def rank_resumes(query: str, resume_data: List[Dict], k: Optional[int] = None,
+                 progress: Optional[ScoringProgress] = None,
+                 candidates: Optional[Container] = None) -> List[Tuple[float, Dict]]:
+    """Best (similarity, resume) pairs above the threshold, best first.
+
+    Only a heap of the k best is kept while scoring, so the rows need no
+    more than ``id`` and ``search_document``. Ties keep input order. The
+    number of resumes above the threshold is counted in ``progress.matched``.
+    When a progress tracker with a budget is given, scoring stops once the
+    deadline passes and the best results found so far are returned. With a
+    candidates set of ids (e.g. from the bitmap index) only those rows are scored.
+    """
+    if candidates is not None:
+        resume_data = [resume for resume in resume_data if resume['id'] in candidates]
+    if progress:
+        progress.total = len(resume_data) + progress.unfetched
     
-    for resume in resume_data:
-        # Combine all searchable text
-        searchable_text = f"{resume['name']} {resume['skills']} {resume['extracted_text']}"
-        
-        # Calculate similarity
-        similarity = calculate_text_similarity(query, searchable_text)
+    # Normalize the query once; resumes carry their normalized search_document,
+    # so ratio() on the two equals token_sort_ratio on the raw texts
+    query_document = normalize_search_text(query)
+    if not query_document:
+        return []
+    
+    heap: List[Tuple[float, int]] = []
+    matched = 0
+    for index, resume in enumerate(resume_data):
+        if progress:
+            if progress.expired():
+                break
+            progress.scored += 1
         
-        if similarity > 0.1:  # Minimum threshold
-            # Extract evidence snippets
-            words = query.lower().split()
-            text_lower = resume['extracted_text'].lower()
-            
-            snippets = []
-            for word in words:
-                if word in text_lower:
-                    # Find context around the word
-                    start_idx = text_lower.find(word)
-                    start = max(0, start_idx - 50)
-                    end = min(len(text_lower), start_idx + 100)
-                    snippet = resume['extracted_text'][start:end].strip()
-                    if snippet and len(snippet) > 10:
-                        snippets.append(f"...{snippet}...")
-            
-            results.append({
-                'resume_id': resume['id'],
-                'name': resume['name'],
-                'email': resume['email'],
-                'similarity_score': similarity,
-                'evidence_snippets': snippets[:3],  # Top 3 snippets
-                'matched_skills': resume['skills']
-            })
+        document = resume.get('search_document') or build_search_document(
+            resume.get('name', ''), resume.get('skills', ''), resume.get('extracted_text', '')
+        )
+        similarity = fuzz.ratio(query_document, document) / 100.0 if document else 0.0
+        if similarity <= 0.1:  # Minimum threshold
+            continue
+        matched += 1
+        # Among equal scores the later resume compares lower and is dropped first
+        entry = (similarity, -index)
+        if k is None or len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
     
-    # Sort by similarity score
-    results.sort(key=lambda x: x['similarity_score'], reverse=True)
-    return results
+    if progress:
+        progress.matched = matched
+    return [(similarity, resume_data[-index]) for similarity, index in sorted(heap, reverse=True)]
 
-def match_job_with_resumes(job_requirements: str, resume_data: List[Dict], top_n: int = 10) -> List[Dict]:
-    """Match a job with resumes based on requirements"""
-    results = []
+def build_search_result(resume: Dict, similarity: float, highlighter: TermHighlighter) -> Dict:
+    """Result entry for one ranked resume; needs its name, email, skills and extracted_text"""
+    # Evidence: the passages densest in query terms, found in one scan of the text
+    text = resume['extracted_text']
+    passages = best_passages(text, highlighter.hits(text))
+    return {
+        'resume_id': resume['id'],
+        'name': resume['name'],
+        'email': resume['email'],
+        'similarity_score': similarity,
+        'evidence_snippets': [format_passage(text, passage) for passage in passages],
+        'evidence': passage_evidence(text, passages),
+        'matched_skills': resume['skills']
+    }
+
+def find_matching_resumes(query: str, resume_data: List[Dict], progress: Optional[ScoringProgress] = None,
+                          k: Optional[int] = None, candidates: Optional[Container] = None) -> List[Dict]:
+    """Find resumes matching a query using fuzzy search, best first (at most k, only candidates if given)"""
+    highlighter = TermHighlighter(tokenize(query))
+    return [
+        build_search_result(resume, similarity, highlighter)
+        for similarity, resume in rank_resumes(query, resume_data, k, progress, candidates)
+    ]
+
+def extract_job_skills(job_requirements: str) -> Set[str]:
+    """Canonical names of the taxonomy skills a job asks for"""
+    return set(get_skill_matcher().find(job_requirements))
+
+def build_job_match(job_requirements: str, resume: Dict, match_score: float,
+                    job_skills: Optional[Set[str]] = None) -> Dict:
+    """Build the match result (skills, requirements, evidence) for one scored resume.
+
+    Pass job_skills (from extract_job_skills) when building many results for
+    the same job so the requirements are only scanned once.
+    """
+    if job_skills is None:
+        job_skills = extract_job_skills(job_requirements)
+    job_requirements_lower = job_requirements.lower()
+    
+    # Find matched skills
+    matcher = get_skill_matcher()
+    matched_skills = []
+    for skill in resume['skills'].split(','):
+        name = matcher.canonical(skill)
+        if name in job_skills and name not in matched_skills:
+            matched_skills.append(name)
+    
+    # Find missing requirements (basic implementation)
+    missing_reqs = []
+    must_have_words = ['required', 'must have', 'essential']
+    for req_word in must_have_words:
+        if req_word in job_requirements_lower:
+            # Simple extraction of requirements after these keywords
+            sentences = job_requirements.split('.')
+            for sentence in sentences:
+                if req_word in sentence.lower():
+                    missing_reqs.append(sentence.strip())
+                    break
+    
+    # Evidence: passages mentioning the most matched skills (aliases included)
+    text = resume['extracted_text']
+    matched = set(matched_skills)
+    passages = best_passages(text, [hit for hit in matcher.finditer(text) if hit[2] in matched])
+    
+    return {
+        'resume_id': resume['id'],
+        'name': resume['name'],
+        'email': resume['email'],
+        'match_score': match_score,
+        'matched_skills': matched_skills,
+        'missing_requirements': missing_reqs,
+        'evidence_snippets': [format_passage(text, passage) for passage in passages],
+        'evidence': passage_evidence(text, passages)
+    }
+
+def rank_job_matches(job_requirements: str, resume_data: List[Dict], top_n: int = 10,
+                     progress: Optional[ScoringProgress] = None,
+                     candidates: Optional[Container] = None) -> List[Tuple[float, Dict]]:
+    """Best (match_score, resume) pairs for a job, best first.
+
+    Only the top_n scores are kept while scoring, so the rows need no more
+    than ``id``, ``skills`` and ``extracted_text``. Honours the deadline of
+    an optional progress tracker and a candidates set like rank_resumes.
+    """
+    heap: List[Tuple[float, int]] = []
+    if candidates is not None:
+        resume_data = [resume for resume in resume_data if resume['id'] in candidates]
+    if progress:
+        progress.total = len(resume_data) + progress.unfetched
     
-    # Extract key requirements
     job_requirements_lower = job_requirements.lower()
     
-    for resume in resume_data:
+    for index, resume in enumerate(resume_data):
+        if progress:
+            if progress.expired():
+                break
+            progress.scored += 1
+        
         # Calculate match score based on skills and text similarity
         skills_text = resume['skills'].lower()
         full_text = f"{resume['skills']} {resume['extracted_text']}".lower()
@@ -156,50 +431,29 @@ def match_job_with_resumes(job_requirements: str, resume_data: List[Dict], top_n
         # Combined score with skills weighted higher
         match_score = (skills_score * 0.7) + (text_score * 0.3)
         
-        if match_score > 0.1:  # Minimum threshold
-            # Find matched skills
-            job_keywords = re.findall(r'\b\w+\b', job_requirements_lower)
-            resume_skills = resume['skills'].lower().split(',')
-            
-            matched_skills = []
-            for skill in resume_skills:
-                skill = skill.strip()
-                if any(keyword in skill for keyword in job_keywords):
-                    matched_skills.append(skill.title())
-            
-            # Find missing requirements (basic implementation)
-            missing_reqs = []
-            must_have_words = ['required', 'must have', 'essential']
-            for req_word in must_have_words:
-                if req_word in job_requirements_lower:
-                    # Simple extraction of requirements after these keywords
-                    sentences = job_requirements.split('.')
-                    for sentence in sentences:
-                        if req_word in sentence.lower():
-                            missing_reqs.append(sentence.strip())
-                            break
-            
-            # Evidence snippets
-            evidence_snippets = []
-            for skill in matched_skills[:3]:
-                if skill.lower() in full_text:
-                    start_idx = full_text.find(skill.lower())
-                    start = max(0, start_idx - 30)
-                    end = min(len(full_text), start_idx + 80)
-                    snippet = resume['extracted_text'][start:end].strip()
-                    if snippet:
-                        evidence_snippets.append(f"...{snippet}...")
-            
-            results.append({
-                'resume_id': resume['id'],
-                'name': resume['name'],
-                'email': resume['email'],
-                'match_score': match_score,
-                'matched_skills': matched_skills,
-                'missing_requirements': missing_reqs,
-                'evidence_snippets': evidence_snippets
-            })
+        if match_score <= 0.1:  # Minimum threshold
+            continue
+        # Ties keep input order, as rank_resumes does
+        entry = (match_score, -index)
+        if len(heap) < top_n:
+            heapq.heappush(heap, entry)
+        elif heap and entry > heap[0]:
+            heapq.heapreplace(heap, entry)
     
-    # Sort by match score
-    results.sort(key=lambda x: x['match_score'], reverse=True)
-    return results[:top_n]
\ No newline at end of file
+    return [
+        (match_score, resume_data[-index]) for match_score, index in sorted(heap, reverse=True)
+    ]
+
+def match_job_with_resumes(job_requirements: str, resume_data: List[Dict], top_n: int = 10,
+                           progress: Optional[ScoringProgress] = None,
+                           candidates: Optional[Container] = None) -> List[Dict]:
+    """Match a job with resumes based on requirements.
+
+    Skills and evidence are built for the top_n winners of rank_job_matches
+    alone, so these rows also need ``name`` and ``email``.
+    """
+    job_skills = extract_job_skills(job_requirements)
+    return [
+        build_job_match(job_requirements, resume, match_score, job_skills)
+        for match_score, resume in rank_job_matches(job_requirements, resume_data, top_n, progress, candidates)
+    ]
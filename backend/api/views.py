@@ -1,15 +1,16 @@
 import os
-import uuid
+import zipfile
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.http import JsonResponse
-from django.db import models
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
 
@@ -17,12 +18,20 @@ from .models import Resume, Job, JobMatch
 from .serializers import (
     UserSerializer, ResumeSerializer, ResumeListSerializer,
     JobSerializer, JobListSerializer, JobMatchSerializer,
-    AskQuerySerializer, MatchJobSerializer
+    AskQuerySerializer, MatchJobSerializer, ResumeStatusSerializer
 )
-from .utils import (
-    extract_text_from_file, extract_skills_from_text,
-    extract_experience_info, find_matching_resumes,
-    match_job_with_resumes
+from .utils import ScoringProgress
+from .search_index import search_resumes
+from .fulltext import get_fulltext_backend
+from .skill_index import filter_by_skills
+from .bitmap_index import filter_candidates
+from .matching import JOB_MATCH_UPSERT, job_match_rows, match_job
+from .timing import annotate, span
+from .pagination import KeysetPagination
+from .fieldsets import SparseFieldsetMixin
+from .ingestion import (
+    enqueue_resume, archive_items, uploaded_file_items, bulk_ingest,
+    store_upload, cached_extractions
 )
 
 # Authentication Views
@@ -80,10 +89,22 @@ def login(request):
     }, status=status.HTTP_401_UNAUTHORIZED)
 
 # Resume Views
-class ResumeListCreateView(generics.ListCreateAPIView):
+def get_or_create_anonymous_user():
+    """Get or create an anonymous user for hackathon demo uploads"""
+    anonymous_user, created = User.objects.get_or_create(
+        username='anonymous_hackathon_user',
+        defaults={
+            'email': 'anonymous@hackathon.demo',
+            'first_name': 'Anonymous',
+            'last_name': 'User'
+        }
+    )
+    return anonymous_user
+
+class ResumeListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
     """GET /api/resumes and POST /api/resumes"""
     queryset = Resume.objects.all()
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [permissions.AllowAny]  # Allow anonymous uploads for hackathon
     
@@ -97,26 +118,35 @@ class ResumeListCreateView(generics.ListCreateAPIView):
         search_query = self.request.query_params.get('q', '')
         
         if search_query:
-            queryset = queryset.filter(
-                models.Q(name__icontains=search_query) |
-                models.Q(email__icontains=search_query) |
-                models.Q(skills__icontains=search_query) |
-                models.Q(extracted_text__icontains=search_query)
-            )
+            # Ranked full-text search where the database supports it; ranked
+            # results are paged by limit/offset rather than by date cursor
+            queryset = get_fulltext_backend().search(queryset, search_query)
+            self.keyset_pagination = False
+        
+        skills = self.request.query_params.getlist('skill')
+        if skills:
+            # Resumes with every listed skill, through the indexed ResumeSkill links
+            queryset = filter_by_skills(queryset, skills)
         
-        return queryset
+        # Experience filters and ordering use the indexed experience_years column
+        for param, lookup in (('min_experience', 'experience_years__gte'), ('max_experience', 'experience_years__lte')):
+            value = self.request.query_params.get(param)
+            if value:
+                try:
+                    queryset = queryset.filter(**{lookup: float(value)})
+                except ValueError:
+                    raise ValidationError({'error': {
+                        'code': 'VALIDATION_ERROR', 'field': param, 'message': f'{param} must be a number'
+                    }})
+        ordering = self.request.query_params.get('ordering')
+        if ordering in ('experience_years', '-experience_years'):
+            queryset = queryset.order_by(ordering, '-created_at', '-id')
+            self.keyset_pagination = False
+        
+        return self.sparse_queryset(queryset)
     
     def get_or_create_anonymous_user(self):
-        """Get or create an anonymous user for hackathon demo uploads"""
-        anonymous_user, created = User.objects.get_or_create(
-            username='anonymous_hackathon_user',
-            defaults={
-                'email': 'anonymous@hackathon.demo',
-                'first_name': 'Anonymous',
-                'last_name': 'User'
-            }
-        )
-        return anonymous_user
+        return get_or_create_anonymous_user()
     
     def create(self, request, *args, **kwargs):
         try:
@@ -140,36 +170,8 @@ class ResumeListCreateView(generics.ListCreateAPIView):
                     }
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Extract text from uploaded file
             resume_file = request.FILES['file']
             
-            # Save file temporarily
-            import tempfile
-            temp_path = os.path.join(tempfile.gettempdir(), f'{uuid.uuid4()}_{resume_file.name}')
-            
-            try:
-                with open(temp_path, 'wb+') as temp_file:
-                    for chunk in resume_file.chunks():
-                        temp_file.write(chunk)
-                
-                # Extract text and skills
-                extracted_text = extract_text_from_file(temp_path)
-                skills = extract_skills_from_text(extracted_text)
-                experience = extract_experience_info(extracted_text)
-                
-            except Exception as e:
-                return Response({
-                    'error': {
-                        'code': 'FILE_PROCESSING_ERROR',
-                        'message': f'Failed to process file: {str(e)}'
-                    }
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-            
             # Prepare data for serializer
             data = request.data.copy()
             if not data.get('name'):
@@ -179,17 +181,65 @@ class ResumeListCreateView(generics.ListCreateAPIView):
             
             serializer = self.get_serializer(data=data)
             if serializer.is_valid():
-                # Save resume with extracted data
+                # Save the pending resume; text, skills and experience are
+                # extracted by the ingestion worker
                 # Handle anonymous users by creating or using a default user
                 user_to_assign = request.user if request.user.is_authenticated else self.get_or_create_anonymous_user()
                 
-                resume = serializer.save(
-                    uploaded_by=user_to_assign,
-                    extracted_text=extracted_text,
-                    skills=', '.join(skills) if skills else '',
-                    experience=experience
-                )
+                # The upload is hashed while it is written to storage
+                with span('store'):
+                    stored_name, content_hash = store_upload(resume_file.name, resume_file)
+                
+                # Optionally hand back the caller's own resume stored for identical bytes
+                if request.query_params.get('dedupe') == 'link' and request.user.is_authenticated:
+                    existing = Resume.objects.filter(uploaded_by=request.user, content_hash=content_hash).first()
+                    if existing:
+                        default_storage.delete(stored_name)
+                        return Response(ResumeSerializer(existing).data, status=status.HTTP_200_OK)
+                
+                # Identical bytes were parsed before: reuse the cached results
+                with span('cache'):
+                    cached = cached_extractions([content_hash]).get(content_hash)
+                annotate(file_size=resume_file.size, extraction_cached=bool(cached))
+                if cached:
+                    with span('save'):
+                        resume = serializer.save(
+                            file=stored_name,
+                            uploaded_by=user_to_assign,
+                            content_hash=content_hash,
+                            status=Resume.STATUS_READY,
+                            **cached
+                        )
+                    return Response(
+                        ResumeSerializer(resume).data,
+                        status=status.HTTP_201_CREATED
+                    )
+                
+                with span('save'):
+                    resume = serializer.save(
+                        file=stored_name,
+                        uploaded_by=user_to_assign,
+                        content_hash=content_hash,
+                        status=Resume.STATUS_PROCESSING
+                    )
+                # Inline ingestion extracts here; async ingestion only queues the job
+                with span('extract'):
+                    enqueue_resume(resume)
+                
+                if settings.RESUME_INGESTION_ASYNC:
+                    return Response(
+                        ResumeSerializer(resume).data,
+                        status=status.HTTP_202_ACCEPTED
+                    )
                 
+                resume.refresh_from_db()
+                if resume.status == Resume.STATUS_FAILED:
+                    return Response({
+                        'error': {
+                            'code': 'FILE_PROCESSING_ERROR',
+                            'message': f'Failed to process file: {resume.processing_error}'
+                        }
+                    }, status=status.HTTP_400_BAD_REQUEST)
                 return Response(
                     ResumeSerializer(resume).data,
                     status=status.HTTP_201_CREATED
@@ -211,23 +261,96 @@ class ResumeListCreateView(generics.ListCreateAPIView):
                 }
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class ResumeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ResumeDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """GET /api/resumes/:id"""
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
     lookup_field = 'id'
+    
+    def get_queryset(self):
+        return self.sparse_queryset(Resume.objects.all())
+
+class ResumeBulkUploadView(APIView):
+    """POST /api/resumes/bulk - Upload many resume files or one ZIP archive"""
+    parser_classes = [MultiPartParser, FormParser]
+    permission_classes = [permissions.AllowAny]  # Same policy as single uploads
+    
+    def post(self, request):
+        files = request.FILES.getlist('files')
+        archive = request.FILES.get('archive')
+        if not files and not archive:
+            return Response({
+                'error': {
+                    'code': 'FIELD_REQUIRED',
+                    'field': 'files/archive',
+                    'message': 'Upload one or more files or a ZIP archive'
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        items = uploaded_file_items(files)
+        if archive:
+            try:
+                items.extend(archive_items(archive))
+            except zipfile.BadZipFile:
+                return Response({
+                    'error': {
+                        'code': 'INVALID_ARCHIVE',
+                        'field': 'archive',
+                        'message': 'Archive is not a valid ZIP file'
+                    }
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if len(items) > settings.RESUME_BULK_MAX_FILES:
+            return Response({
+                'error': {
+                    'code': 'TOO_MANY_FILES',
+                    'message': f'At most {settings.RESUME_BULK_MAX_FILES} files can be uploaded at once'
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        user = request.user if request.user.is_authenticated else get_or_create_anonymous_user()
+        report = bulk_ingest(items, user, request.headers.get('Idempotency-Key', ''))
+        
+        counts = {state: sum(1 for entry in report if entry['status'] == state)
+                  for state in ('created', 'processing', 'duplicate', 'failed')}
+        if counts['processing']:
+            response_status = status.HTTP_202_ACCEPTED  # Poll each resume's status URL
+        elif counts['created']:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({
+            'total': len(report),
+            'created': counts['created'],
+            'processing': counts['processing'],
+            'duplicates': counts['duplicate'],
+            'failed': counts['failed'],
+            'results': report
+        }, status=response_status)
+
+class ResumeStatusView(generics.RetrieveAPIView):
+    """GET /api/resumes/:id/status - Poll extraction progress of an upload"""
+    queryset = Resume.objects.only(
+        'id', 'status', 'processing_error', 'skills', 'experience', 'experience_years', 'updated_at'
+    )
+    serializer_class = ResumeStatusSerializer
+    permission_classes = [permissions.AllowAny]  # Anonymous uploaders poll too
+    lookup_field = 'id'
 
 # Job Views
-class JobListCreateView(generics.ListCreateAPIView):
+class JobListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
     """GET /api/jobs and POST /api/jobs"""
     queryset = Job.objects.all()
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return JobListSerializer
         return JobSerializer
     
+    def get_queryset(self):
+        return self.sparse_queryset(Job.objects.all())
+    
     def perform_create(self, serializer):
         # Handle idempotency
         idempotency_key = self.request.headers.get('Idempotency-Key')
@@ -242,11 +365,14 @@ class JobListCreateView(generics.ListCreateAPIView):
         
         return serializer.save(created_by=self.request.user)
 
-class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
+class JobDetailView(SparseFieldsetMixin, generics.RetrieveUpdateDestroyAPIView):
     """GET /api/jobs/:id"""
     queryset = Job.objects.all()
     serializer_class = JobSerializer
     lookup_field = 'id'
+    
+    def get_queryset(self):
+        return self.sparse_queryset(Job.objects.all())
 
 # Ask Query View
 @api_view(['POST'])
@@ -264,19 +390,20 @@ def ask_query(request):
     
     query = serializer.validated_data['query']
     k = serializer.validated_data['k']
+    progress = ScoringProgress(serializer.validated_data.get('budget_ms'))
     
-    # Get all resumes data
-    resumes = Resume.objects.all().values(
-        'id', 'name', 'email', 'skills', 'extracted_text'
-    )
-    
-    # Find matching resumes
-    results = find_matching_resumes(query, list(resumes))
+    # Only score resumes sharing at least one term with the query (and passing
+    # the filter, if any), keeping the best k
+    candidates = filter_candidates(serializer.validated_data.get('filter'))
+    results = search_resumes(query, k, progress, candidates)
+    annotate(corpus_size=progress.total, scored=progress.scored, matched=progress.matched)
     
     return Response({
         'query': query,
-        'total_results': len(results),
-        'results': results[:k]
+        'total_results': progress.matched,
+        'partial': progress.partial,
+        'scored_fraction': round(progress.fraction_scored, 4),
+        'results': results
     })
 
 # Job Matching View
@@ -296,40 +423,24 @@ def match_job_with_candidates(request, job_id):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     top_n = serializer.validated_data['top_n']
+    progress = ScoringProgress(serializer.validated_data.get('budget_ms'))
     
-    # Get all resumes data
-    resumes = Resume.objects.all().values(
-        'id', 'name', 'email', 'skills', 'extracted_text'
-    )
-    
-    # Match job with resumes
-    job_requirements = f"{job.description} {job.requirements}"
-    matches = match_job_with_resumes(job_requirements, list(resumes), top_n)
+    # Match job with resumes, reusing the cached run when the corpus has not changed
+    candidates = filter_candidates(serializer.validated_data.get('filter'))
+    matches, cache_status = match_job(job, top_n, progress, candidates)
+    annotate(corpus_size=progress.total, scored=progress.scored, cache_status=cache_status)
     
-    # Store matches in database for future reference
-    for match_data in matches:
-        resume = Resume.objects.get(id=match_data['resume_id'])
-        job_match, created = JobMatch.objects.get_or_create(
-            job=job,
-            resume=resume,
-            defaults={
-                'match_score': match_data['match_score'],
-                'matched_skills': ', '.join(match_data['matched_skills']),
-                'missing_requirements': ' | '.join(match_data['missing_requirements']),
-                'evidence_snippets': ' | '.join(match_data['evidence_snippets'])
-            }
-        )
-        if not created:
-            # Update existing match
-            job_match.match_score = match_data['match_score']
-            job_match.matched_skills = ', '.join(match_data['matched_skills'])
-            job_match.missing_requirements = ' | '.join(match_data['missing_requirements'])
-            job_match.evidence_snippets = ' | '.join(match_data['evidence_snippets'])
-            job_match.save()
+    # Store matches in database for future reference, upserting all rows in one statement
+    if cache_status != 'hit':
+        with span('persist'):
+            JobMatch.objects.bulk_create(job_match_rows(job, matches), **JOB_MATCH_UPSERT)
     
     return Response({
         'job_id': job_id,
         'job_title': job.title,
         'total_matches': len(matches),
+        'partial': progress.partial,
+        'scored_fraction': round(progress.fraction_scored, 4),
+        'cache_status': cache_status,
         'matches': matches
     })
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -98,6 +99,36 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Search and matching
+# 'tfidf' ranks job matches with the in-memory TF-IDF matrices in api/matching.py,
+# 'fuzzy' scores every resume with rapidfuzz as before, and 'sharded' gives the
+# fuzzy results using JOB_MATCH_SHARDS worker processes. Every server process
+# (e.g. each gunicorn worker) starts its own pool, so keep the default small.
+JOB_MATCH_ENGINE = os.environ.get('JOB_MATCH_ENGINE', 'tfidf')
+JOB_MATCH_SHARDS = int(os.environ.get('JOB_MATCH_SHARDS', min(2, os.cpu_count() or 1)))
+# Full-text backend for the resume list ?q= filter: 'auto' (FTS5 on SQLite,
+# tsvector on Postgres), 'sqlite_fts5', 'postgres_tsvector' or 'like'
+RESUME_SEARCH_BACKEND = os.environ.get('RESUME_SEARCH_BACKEND', 'auto')
+# Async endpoints (ask/async/, jobs/<id>/match/async/) score in a bounded thread
+# pool: SCORING_CONCURRENCY run at once, SCORING_MAX_QUEUED wait, the rest get 503
+SCORING_CONCURRENCY = int(os.environ.get('SCORING_CONCURRENCY', min(4, os.cpu_count() or 1)))
+SCORING_MAX_QUEUED = int(os.environ.get('SCORING_MAX_QUEUED', 8))
+# Job match results are cached per job and corpus generation (seconds)
+JOB_MATCH_CACHE_TIMEOUT = int(os.environ.get('JOB_MATCH_CACHE_TIMEOUT', 3600))
+
+# Resume ingestion
+# Uploads return 202 and are extracted in a local process pool; set
+# RESUME_INGESTION_ASYNC=False to extract inline in the request.
+RESUME_INGESTION_ASYNC = os.environ.get('RESUME_INGESTION_ASYNC', 'True') == 'True'
+RESUME_INGESTION_WORKERS = int(os.environ.get('RESUME_INGESTION_WORKERS', os.cpu_count() or 1))
+# Per-document extraction limits; larger documents are truncated and flagged on the resume
+RESUME_EXTRACTION_MAX_PAGES = int(os.environ.get('RESUME_EXTRACTION_MAX_PAGES', 50))
+RESUME_EXTRACTION_MAX_CHARS = int(os.environ.get('RESUME_EXTRACTION_MAX_CHARS', 200000))
+RESUME_EXTRACTION_TIME_LIMIT = float(os.environ.get('RESUME_EXTRACTION_TIME_LIMIT', 30))  # seconds
+# Limits for POST /api/resumes/bulk/
+RESUME_BULK_MAX_FILES = int(os.environ.get('RESUME_BULK_MAX_FILES', 5000))
+RESUME_BULK_MAX_FILE_SIZE = int(os.environ.get('RESUME_BULK_MAX_FILE_SIZE', 10 * 1024 * 1024))
+
 # Optional: Allow anonymous resume upload
 # You can create a custom permission in your api/views.py if needed
 
@@ -111,3 +142,36 @@ SIMPLE_JWT = {
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = [
+    'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset', 'X-RateLimit-Cost', 'Retry-After',
+    'Server-Timing',
+]
+
+# Rate limiting (api.middleware.RateLimitMiddleware). Job matching and bulk
+# uploads cost 10 tokens, /api/ask 5, single uploads 2, everything else 1.
+RATE_LIMIT_TOKENS = int(os.environ.get('RATE_LIMIT_TOKENS', 60))
+RATE_LIMIT_WINDOW = int(os.environ.get('RATE_LIMIT_WINDOW', 60))  # seconds
+
+# Counters must live in a shared cache for limits to hold across gunicorn workers
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+
+# Request timing (api.middleware.ServerTimingMiddleware): per-stage durations in a
+# Server-Timing header and one JSON log line per request on the api.timing logger
+REQUEST_TIMING = os.environ.get('REQUEST_TIMING', 'False') == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -1,5 +1,21 @@
 import React, { useState } from 'react';
 import axios from 'axios';
+import { resumeAPI } from '../services/api';
+
+const POLL_INTERVAL_MS = 1000;
+const POLL_ATTEMPTS = 60;
+
+// Uploads answered with 202 are extracted in the background; poll until they finish
+const waitForProcessing = async (id) => {
+  for (let attempt = 0; attempt < POLL_ATTEMPTS; attempt++) {
+    const { data } = await resumeAPI.getResumeStatus(id);
+    if (data.status !== 'processing') {
+      return data;
+    }
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+  return { id, status: 'processing' };
+};
 
 const Upload = () => {
   const [files, setFiles] = useState([]);
@@ -70,13 +86,33 @@ const Upload = () => {
         });
         
         console.log('Upload successful:', response.data);
-        
-        results.push({
-          file: file.name,
-          status: 'success',
-          message: 'Uploaded successfully',
-          data: response.data
-        });
+
+        const data = response.data.status === 'processing'
+          ? await waitForProcessing(response.data.id)
+          : response.data;
+
+        if (data.status === 'failed') {
+          results.push({
+            file: file.name,
+            status: 'error',
+            message: `Processing failed: ${data.processing_error || 'unknown error'}`,
+            data
+          });
+        } else if (data.status === 'processing') {
+          results.push({
+            file: file.name,
+            status: 'pending',
+            message: 'Uploaded, still processing - check back shortly',
+            data
+          });
+        } else {
+          results.push({
+            file: file.name,
+            status: 'success',
+            message: 'Uploaded and processed successfully',
+            data
+          });
+        }
       } catch (error) {
         console.error('Upload error:', error);
         
@@ -221,9 +257,11 @@ const Upload = () => {
                         <span className={`inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium ${
                           result.status === 'success' 
                             ? 'bg-green-100 text-green-800' 
-                            : 'bg-red-100 text-red-800'
+                            : result.status === 'pending'
+                              ? 'bg-yellow-100 text-yellow-800'
+                              : 'bg-red-100 text-red-800'
                         }`}>
-                          {result.status === 'success' ? '✓ Success' : '✗ Error'}
+                          {result.status === 'success' ? '✓ Success' : result.status === 'pending' ? '… Processing' : '✗ Error'}
                         </span>
                       </div>
                       <div className="ml-4">
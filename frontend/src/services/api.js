@@ -85,6 +85,7 @@ export const resumeAPI = {
   },
 
   getResume: (id) => api.get(`/resumes/${id}/`),
+  getResumeStatus: (id) => api.get(`/resumes/${id}/status/`),
 
   searchResumes: async (query, limit = 10, offset = 0) => {
     const res = await api.get('/resumes/', {